@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstd is preferred; fall back to gzip so archiving still works without it
+    zstandard = None
+
+# --- Raw page archive ---
+# Page bodies are stored once per distinct content under objects/<aa>/<sha256>.<codec>
+# and every run appends {url, kind, sha256, ...} lines to runs/<run_id>.jsonl, so
+# a run can be re-extracted later without touching the network.
+
+ARCHIVE_DIR = "page_archive"
+ZSTD_LEVEL = 10
+
+
+def _blob_path(root: str, digest: str, codec: str) -> str:
+    return os.path.join(root, "objects", digest[:2], f"{digest}.{codec}")
+
+
+def manifest_path(root: str, run_id: str) -> str:
+    return os.path.join(root, "runs", f"{run_id}.jsonl")
+
+
+class PageArchive:
+    """Content-addressed, compressed store of fetched and rendered pages for one run."""
+
+    def __init__(self, run_id: str, root: str = ARCHIVE_DIR):
+        self.root = root
+        self.run_id = run_id
+        self.codec = "zst" if zstandard else "gz"
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard else None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "runs"), exist_ok=True)
+        self._manifest = open(manifest_path(root, run_id), 'a', encoding='utf-8')
+        logging.info(f"Archiving pages to {root} (run {run_id}, {self.codec})")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self._compressor:
+            return self._compressor.compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def put(self, url: str, content: str, kind: str, **meta) -> str:
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = _blob_path(self.root, digest, self.codec)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(self._compress(data))
+            os.replace(tmp, path)
+
+        entry = {
+            "url": url,
+            "kind": kind,
+            "sha256": digest,
+            "codec": self.codec,
+            "fetched_at": datetime.now().isoformat(timespec='seconds'),
+            "meta": meta,
+        }
+        with self._lock:
+            self._manifest.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._manifest.flush()
+        return digest
+
+    def close(self):
+        with self._lock:
+            self._manifest.close()
+
+
+def iter_manifest(run_id: str, root: str = ARCHIVE_DIR):
+    with open(manifest_path(root, run_id), 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_blob(digest: str, codec: str, root: str = ARCHIVE_DIR) -> str:
+    with open(_blob_path(root, digest, codec), 'rb') as f:
+        data = f.read()
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive blobs (pip install zstandard)")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
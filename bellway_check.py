@@ -1,43 +1,58 @@
-import requests
-from bs4 import BeautifulSoup
-import csv
 import time
-from playwright.sync_api import sync_playwright
+STARTED_AT = time.perf_counter()  # Startup time reported by --check
+import csv
 import re
 from datetime import datetime
-import urllib3
 import logging
 import random
 import signal
 import sys
+import argparse
+import json
+import os
+import glob
+from contextlib import ExitStack
+from urllib.parse import urlparse
+from collections import deque
+import profiling
+import logsetup
+from retry import RETRYABLE_STATUSES, RetryPolicy, RetryError, call_with_retry, request_with_retry
+from archive import ARCHIVE_DIR, PageArchive, iter_manifest, manifest_path, read_blob
+from targets import CrawlTargets, add_target_arguments
+from writer import CsvSink, TeeSink
+from sqlite_sink import DB_FILE, SqliteSink
+from record import PlotRecord
+from constant import OUTPUT_COLUMNS
+from classifier import KeywordClassifier
+from scheduler import STATE_FILE, Budget, CrawlState, fingerprint
+
+# Playwright, bs4, the sitemap parser and process pools are imported where they
+# are first used so --check and small jobs start without loading them.
 
 
 RUN_DATE = datetime.now().strftime('%m_%d_%Y_%H_%M_%S')
 LOG_FILE = f"bellway_log_{RUN_DATE}.log"
 OUTPUT_CSV = f"mpi_bellway_{RUN_DATE}.csv"
+TARGETED_OUTPUT_CSV = f"mpi_bellway_targeted_{RUN_DATE}.csv"
+PARTIAL_OUTPUT_CSV = f"mpi_bellway_partial_{RUN_DATE}.csv"  # Full run in progress; renamed to OUTPUT_CSV once complete
+CHANGES_CSV = f"bellway_changes_{RUN_DATE}.csv"
+JSON_LOG_FILE = f"bellway_log_{RUN_DATE}.jsonl"
+SNAPSHOT_PATTERN = re.compile(r'^mpi_bellway_\d{2}_\d{2}_\d{4}_\d{2}_\d{2}_\d{2}\.csv$')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-rows = []
-base_info = None  # Global variable to store base info for interrupt handler
+sink = None  # Global CSV sink so the interrupt handler can flush and close it
+archive = None  # PageArchive when --archive is on
+offline = False  # Set during --replay so nothing touches the network
+crawl_state = None  # CrawlState recording per-page scrape history
+budget = None  # Budget when --schedule/--budget is on; work is then ranked by the crawl state
 
 def fn_handle_interrupt(signal, frame):
     logging.warning("Script interrupted. Saving progress...")
-    if base_info:
-        fn_save_csv(rows, base_info)
+    if sink:
+        sink.close()
     else:
-        logging.warning("No base info available for saving")
+        logging.warning("No output open for saving")
     sys.exit(0)
 
-signal.signal(signal.SIGINT, fn_handle_interrupt)
-
 def fn_human_delay(min_delay=0.5, max_delay=1.5):
     """Sleep for a random time between min_delay and max_delay seconds."""
     delay = random.uniform(min_delay, max_delay)
@@ -52,88 +67,74 @@ HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
 }
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 BASE_URL = "https://www.bellway.co.uk"
 
+# Keyword categories used to tag feature, proximity and floor-plan lines in one pass
+BELLWAY_CLASSIFIER = KeywordClassifier({
+    "proximity": ['station', 'drive', 'minute', 'mile', 'km', 'near', 'close to', 'nearby'],
+    "parking": ['garage', 'driveway', 'parking', 'allocated space', 'car port', 'off-road', 'garden'],
+    "bedroom": ['bedroom'],
+    "ensuite": ['en suite', 'ensuite'],
+    "bathroom": ['bathroom'],
+    "living": ['living', 'dining', 'lounge', 'reception'],
+    "warranty": ['nhbc', 'warranty'],
+})
+
 def fn_get_base_info():
-    return {
-        "COMPANY_NAME": "BELLWAY", 
+    base = dict.fromkeys(OUTPUT_COLUMNS, "NOT_AVAILABLE")
+    base.update({
+        "COMPANY_NAME": "BELLWAY",
         "BRAND_NAME": "BELLWAY",
-        "SOURCE_SITE": "BELLWAY", 
-        "OUTLET": "NOT_AVAILABLE",
-        "REGION": "NOT_AVAILABLE", 
-        "ADDRESS": "NOT_AVAILABLE",
-        "AREA": "NOT_AVAILABLE", 
-        "SUB_AREA": "NOT_AVAILABLE",
-        "COUNTY": "NOT_AVAILABLE", 
-        "CITY":"NOT_AVAILABLE",
-        "LOCATION": "NOT_AVAILABLE",
-        "POSTCODE": "NOT_AVAILABLE", 
-        "PLOT": "NOT_AVAILABLE",
-        "TYPE": "NOT_AVAILABLE", 
-        "PROPERTY_TYPE": "NOT_AVAILABLE",
-        "PRICE_RANGE": "NOT_AVAILABLE", 
-        "PRICE_LATEST": "NOT_AVAILABLE",
-        "AVAILABILITY": "NOT_AVAILABLE", 
-        "BEDROOM": "NOT_AVAILABLE",
-        "BATHROOM": "NOT_AVAILABLE", 
-        "LIVING_ROOM": "NOT_AVAILABLE",
-        "GROUND_FLOOR_DIMENSIONS": "NOT_AVAILABLE",
-        "FIRST_FLOOR_DIMENSIONS": "NOT_AVAILABLE",
-        "SECOND_FLOOR_DIMENSIONS": "NOT_AVAILABLE",
-        "LONGITUDE": "NOT_AVAILABLE", 
-        "LATITUDE": "NOT_AVAILABLE",
-        "SCHEMES_OFFERS": "NOT_AVAILABLE",
-        "SCHEMES_OFFERS_DATE": "NOT_AVAILABLE",
-        "EVENT": "NOT_AVAILABLE", 
-        "EVENT_DATE": "NOT_AVAILABLE",
-        "FEATURES": "NOT_AVAILABLE", 
-        "TENURE": "NOT_AVAILABLE",
-        "NHBC_WARRANTY": "NOT_AVAILABLE", 
-        "HBF_STAR_RATING": "NOT_AVAILABLE",
-        "PARKING_CONFIGURATION": "NOT_AVAILABLE",
-        "EXPECTED_COMPLETION_DATE": "NOT_AVAILABLE",
-        "PROXIMITY": "NOT_AVAILABLE", 
+        "SOURCE_SITE": "BELLWAY",
         "RUN_DATE": RUN_DATE,
-        "URL": "NOT_AVAILABLE"
-    }
-    
-def fn_save_csv(rows, base):
-    if not rows:
-        logging.warning("No data to save.")
-        return
-    try:
-        logging.info(f"Saving {len(rows)} records to {OUTPUT_CSV}")
-        with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=list(base.keys()))
-            writer.writeheader()
-            for r in rows:
-                writer.writerow(r)
-        logging.info(f"Successfully saved {len(rows)} records to {OUTPUT_CSV}")
-    except Exception as e:
-        logging.error(f"Error saving CSV: {e}")
+    })
+    return base
 
-def fn_fetch_page_data(url, retries=3, timeout=30):
-    attempt = 0
-    while attempt < retries:
+def fn_soup(markup):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
+def fn_open_csv_sink(base, targeted=False, db_path=None):
+    # Partial runs get their own name so they are never mistaken for a full snapshot;
+    # a full run only becomes OUTPUT_CSV once it has finished (fn_publish_snapshot)
+    filename = TARGETED_OUTPUT_CSV if targeted else PARTIAL_OUTPUT_CSV
+    logging.info(f"Streaming records to {filename}")
+    csv_sink = CsvSink(filename, list(base.keys()))
+    if db_path:
+        return TeeSink(csv_sink, SqliteSink(db_path))
+    return csv_sink
+
+def fn_publish_snapshot():
+    """Give a completed full run its snapshot name so --poll and normalise.py pick it up."""
+    if os.path.exists(PARTIAL_OUTPUT_CSV):
+        os.replace(PARTIAL_OUTPUT_CSV, OUTPUT_CSV)
+        logging.info(f"Full snapshot saved as {OUTPUT_CSV}")
+
+def fn_archive_page(url, content, kind, **meta):
+    if archive is not None:
         try:
-            logging.info(f"Fetching URL: {url}")
-            response = requests.get(url, headers=HEADERS, timeout=timeout, verify=False)
-            response.raise_for_status()
-            return response
-        except (requests.exceptions.RequestException, requests.exceptions.Timeout) as e:
-            attempt += 1
-            logging.warning(f"Error fetching {url}: {e}. Retrying {attempt}/{retries}...")
-            time.sleep(2)
-    logging.error(f"Failed to fetch {url} after {retries} attempts.")
-    return None
+            archive.put(url, content, kind, **meta)
+        except Exception as e:
+            logging.warning(f"Could not archive {url}: {e}")
+
+def fn_fetch_page_data(url, retries=3, timeout=30):
+    logging.info(f"Fetching URL: {url}", extra={"sample": "fetch"})
+    policy = RetryPolicy(attempts=retries, timeout=timeout)
+    try:
+        return request_with_retry(url, policy, headers=HEADERS, verify=False)
+    except RetryError as e:
+        logging.error(str(e))
+        return None
 
 
 def fn_get_our_locations_url():
     fn_human_delay()
     logging.info("Fetching 'Our locations' URL...")
-    resp = requests.get(BASE_URL, headers=HEADERS, verify=False)
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    resp = fn_fetch_page_data(BASE_URL)
+    if not resp:
+        return None
+    fn_archive_page(BASE_URL, resp.text, "navigation")
+    soup = fn_soup(resp.text)
     for div in soup.find_all('div', class_='nav-link with-dropdown'):
         a = div.find('a', href=True)
         if a and 'Buying with Bellway' in a.text:
@@ -149,9 +150,12 @@ def fn_scrape_map_regions(loc_url):
     """Scrape regions from the map links instead of info-boxes"""
     fn_human_delay()
     logging.info(f"Scraping map regions from {loc_url}")
-    resp = requests.get(loc_url, headers=HEADERS, verify=False)
-    soup = BeautifulSoup(resp.text, 'html.parser')
     regions = []
+    resp = fn_fetch_page_data(loc_url)
+    if not resp:
+        return regions
+    fn_archive_page(loc_url, resp.text, "navigation")
+    soup = fn_soup(resp.text)
     
     # Look for map links with class 'map-point'
     map_div = soup.find('div', class_='map')
@@ -162,7 +166,7 @@ def fn_scrape_map_regions(loc_url):
                 name = span.text.strip()
                 url = BASE_URL + link['href']
                 regions.append({'name': name, 'url': url})
-                logging.info(f"Found map region: {name} - {url}")
+                logging.info(f"Found map region: {name} - {url}", extra={"sample": "region"})
     
     logging.info(f"Found {len(regions)} regions from map.")
     return regions
@@ -171,9 +175,12 @@ def fn_scrape_developments_from_tiles(region_url):
     """Scrape developments from the new tile-based structure"""
     fn_human_delay()
     logging.info(f"Scraping developments from tiles: {region_url}")
-    resp = requests.get(region_url, headers=HEADERS, verify=False)
-    soup = BeautifulSoup(resp.text, 'html.parser')
     devs = []
+    resp = fn_fetch_page_data(region_url)
+    if not resp:
+        return devs
+    fn_archive_page(region_url, resp.text, "region")
+    soup = fn_soup(resp.text)
     
     # Look for the search results container
     search_container = soup.find('section', class_='search-results-container')
@@ -222,7 +229,7 @@ def fn_scrape_developments_from_tiles(region_url):
                 
                 if name and url:
                     devs.append({'name': name, 'url': url})
-                    logging.info(f"Found development: {name} - {url}")
+                    logging.info(f"Found development: {name} - {url}", extra={"sample": "development"})
                 else:
                     logging.warning(f"Could not extract development info from tile")
     
@@ -248,6 +255,7 @@ def fn_extract_location_and_county(address, default_location="NOT_AVAILABLE", de
 
 
 postcode_cache = {}
+POSTCODE_POLICY = RetryPolicy(attempts=3, timeout=10, deadline=30)
 
 def fn_get_postcode_data(postcode):
     postcode_clean = postcode.replace(" ", "").upper()
@@ -261,21 +269,26 @@ def fn_get_postcode_data(postcode):
 
     if postcode_clean in postcode_cache:
         return postcode_cache[postcode_clean]
+    if offline:
+        return {
+            "city": "NOT_AVAILABLE",
+            "latitude": "NOT_AVAILABLE",
+            "longitude": "NOT_AVAILABLE"
+        }
 
     url = f"https://api.postcodes.io/postcodes/{postcode_clean}"
     try:
-        resp = requests.get(url, timeout=10, verify=False)
-        if resp.status_code == 200:
-            data = resp.json().get("result", {})
-            city = data.get("admin_district") or data.get("nuts") or "NOT_AVAILABLE"
-            latitude = data.get("latitude") or "NOT_AVAILABLE"
-            longitude = data.get("longitude") or "NOT_AVAILABLE"
-        elif resp.status_code == 404:
+        resp = request_with_retry(url, POSTCODE_POLICY, verify=False)
+        data = resp.json().get("result", {})
+        city = data.get("admin_district") or data.get("nuts") or "NOT_AVAILABLE"
+        latitude = data.get("latitude") or "NOT_AVAILABLE"
+        longitude = data.get("longitude") or "NOT_AVAILABLE"
+    except RetryError as e:
+        if e.response is not None and e.response.status_code == 404:
             logging.info(f"Postcode not found: {postcode_clean}")
-            city = latitude = longitude = "NOT_AVAILABLE"
         else:
-            logging.warning(f"Unexpected status code {resp.status_code} for postcode {postcode_clean}")
-            city = latitude = longitude = "NOT_AVAILABLE"
+            logging.warning(f"Could not fetch data for postcode {postcode_clean}: {e}")
+        city = latitude = longitude = "NOT_AVAILABLE"
     except Exception as e:
         logging.warning(f"Could not fetch data for postcode {postcode_clean}: {e}")
         city = latitude = longitude = "NOT_AVAILABLE"
@@ -287,30 +300,33 @@ def fn_get_postcode_data(postcode):
     }
 
     postcode_cache[postcode_clean] = result
+    fn_archive_page(url, json.dumps(result), "postcode", postcode=postcode_clean)
     return result
 
 def fn_extract_proximity_and_parking(dev_html, base):
-    soup = BeautifulSoup(dev_html, 'html.parser')
+    soup = fn_soup(dev_html)
     prox = []
     parking = base["PARKING_CONFIGURATION"]
-    parking_keywords = ['garage', 'driveway', 'parking', 'allocated space', 'car port', 'off-road', 'garden']
 
     fdiv = soup.find('div', class_='column', attrs={'data-read-more-outer': True})
     if fdiv:
-        for li in fdiv.find_all('li'):
-            txt = li.get_text(strip=True)
-            txt_lower = txt.lower()
-            if any(w in txt_lower for w in ['station','drive','minute','mile','km','near','close to','nearby']):
+        lines = [li.get_text(strip=True) for li in fdiv.find_all('li')]
+        for txt, tags in zip(lines, BELLWAY_CLASSIFIER.classify_lines(lines)):
+            if "proximity" in tags:
                 prox.append(txt)
-            if parking == base["PARKING_CONFIGURATION"] and any(k in txt_lower for k in parking_keywords):
+            if parking == base["PARKING_CONFIGURATION"] and "parking" in tags:
                 parking = txt
 
     return " / ".join(prox) if prox else base["PROXIMITY"], parking
 
-def fn_scrape_development_details(dev_url, base):
-    fn_human_delay()
-    resp = requests.get(dev_url, headers=HEADERS, verify=False)
-    soup = BeautifulSoup(resp.text, 'html.parser')
+def fn_scrape_development_details(dev_url, base, html=None):
+    if html is None:
+        fn_human_delay()
+        resp = fn_fetch_page_data(dev_url)
+        if not resp:
+            return base["ADDRESS"], base["POSTCODE"], base["LOCATION"], base["PRICE_RANGE"], []
+        html = resp.text
+    soup = fn_soup(html)
     address = base["ADDRESS"]
     price = base["PRICE_RANGE"]
     ds = soup.find('div', class_='details static')
@@ -346,7 +362,7 @@ def fn_scrape_development_details(dev_url, base):
     return address, postcode, loc, price, types
 
 def fn_extract_floor_dimensions(html, base):
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = fn_soup(html)
     blocks = soup.select('div.carousel-text-container > div.content > div.content')
     keys = ["GROUND_FLOOR_DIMENSIONS","FIRST_FLOOR_DIMENSIONS","SECOND_FLOOR_DIMENSIONS"]
     dims = {k: [base[k]] for k in keys}
@@ -369,276 +385,818 @@ def fn_extract_floor_dimensions(html, base):
 
 def fn_count_rooms(dims):
     b = ba = l = 0
-    for lines in dims.values():
-        for ln in lines:
-            lw = ln.lower()
-
-            # Bedroom: exclude "en suite" or similar additions
-            if 'bedroom' in lw and not any(x in lw for x in ['en suite', 'ensuite']):
-                b += 1
+    lines = [ln for lines in dims.values() for ln in lines]
+    for tags in BELLWAY_CLASSIFIER.classify_lines(lines):
+        # Bedroom: exclude "en suite" or similar additions
+        if "bedroom" in tags and "ensuite" not in tags:
+            b += 1
 
-            # Bathroom
-            elif 'bathroom' in lw:
-                ba += 1
+        # Bathroom
+        elif "bathroom" in tags:
+            ba += 1
 
-            # Living / common areas
-            elif any(x in lw for x in ['living', 'dining', 'lounge', 'reception']):
-                l += 1
+        # Living / common areas
+        elif "living" in tags:
+            l += 1
 
     return b, ba, l
 
 
-def fn_scrape_type_page(playwright, type_url, type_name, base):
-    browser = None
-    page = None
+# --- Type page rendering ---
+# One browser context is shared by every type page in the run so site CSS, JS
+# bundles and fonts are fetched once and then served from the HTTP cache. With
+# --browser-profile the context is persistent and the disk cache survives
+# between runs; --browser-cache-mb bounds its size.
+
+render_stats = {"pages": 0, "bytes": 0, "requests": 0, "cached": 0}
+
+def fn_open_browser_context(playwright, profile_dir=None, cache_mb=256):
+    """Return (browser, context); browser is None for a persistent profile context."""
+    args = [f"--disk-cache-size={cache_mb * 1024 * 1024}"]
+    if profile_dir:
+        logging.info(f"Using persistent browser profile: {profile_dir}")
+        context = playwright.chromium.launch_persistent_context(profile_dir, headless=True, args=args)
+        return None, context
+    browser = playwright.chromium.launch(headless=True, args=args)
+    return browser, browser.new_context()
+
+def fn_close_browser_context(browser, context):
+    for target in (context, browser):
+        if target:
+            try:
+                target.close()
+            except Exception as e:
+                logging.warning(f"Error closing browser: {e}")
+    if render_stats["pages"]:
+        logging.info(
+            f"Rendered {render_stats['pages']} type pages, "
+            f"{render_stats['bytes'] / 1024:.0f} KiB transferred, "
+            f"{render_stats['cached']}/{render_stats['requests']} requests served from cache"
+        )
+
+def fn_track_transfer(context, page):
+    """Count bytes on the wire and cache hits for a page via the Chromium DevTools protocol."""
+    stats = {"bytes": 0, "requests": 0, "cached": 0}
     try:
-        browser = playwright.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(type_url, timeout=60000)
-        page.wait_for_selector('div.column[data-read-more-outer]', timeout=10000, state="attached")
+        cdp = context.new_cdp_session(page)
+        cdp.send("Network.enable")
     except Exception as e:
-        logging.error(f"Failed to load or render {type_url}: {e}")
-        if browser:
-            try:
-                browser.close()
-            except Exception as close_err:
-                logging.warning(f"Error closing browser after failed load: {close_err}")
-        return base["FEATURES"], base["NHBC_WARRANTY"], {}, base["BEDROOM"], base["BATHROOM"], base["LIVING_ROOM"], []
+        logging.debug(f"Transfer tracking unavailable: {e}")
+        return stats
+
+    def on_finished(event):
+        stats["bytes"] += event.get("encodedDataLength", 0)
+
+    def on_request(event):
+        stats["requests"] += 1
+
+    def on_cached(event):
+        stats["cached"] += 1
 
+    cdp.on("Network.loadingFinished", on_finished)
+    cdp.on("Network.requestWillBeSent", on_request)
+    cdp.on("Network.requestServedFromCache", on_cached)
+    return stats
+
+# Renders share the per-host circuit breaker with plain requests, so a throttled
+# host pauses the whole crawl rather than just the requests side of it
+RENDER_POLICY = RetryPolicy(attempts=3, timeout=60, deadline=300)
+
+def fn_render_once(context, type_url):
+    """One render attempt; raises on load failure or a retryable HTTP status, RetryError on a fatal one."""
+    page = context.new_page()
     try:
-        html_type = page.content()
-        soup = BeautifulSoup(html_type, 'html.parser')
-        
-        # First, extract the actual TYPE name from the page title
-        actual_type_name = type_name
-        title_h1 = soup.select_one('main.house-development h1')
-        if title_h1:
-            actual_type_name = title_h1.get_text(strip=True)
-            logging.info(f"Found page TYPE name: {actual_type_name}")
-        
-        # Convert type name to data-house-style format (e.g., "The Kinloch" -> "the-kinloch")
-        style_slug = actual_type_name.lower().replace(" ", "-")
-        logging.info(f"Looking for plots with style slug: {style_slug}")
-
-        features = []
-        fdiv = soup.find('div', class_='column', attrs={'data-read-more-outer': True})
-        if fdiv:
-            for li in fdiv.find_all('li'):
-                txt = li.get_text(strip=True)
-                if txt and txt not in features:
-                    features.append(txt)
-            templates = fdiv.find_all('template', attrs={'x-if': 'showMoreFeatures'})
-            for tmpl in templates:
-                tsoup = BeautifulSoup(tmpl.decode_contents(), 'html.parser')
-                for li in tsoup.find_all('li'):
-                    txt = li.get_text(strip=True)
-                    if txt and txt not in features:
-                        features.append(txt)
-
-        feat_str = " / ".join(features) if features else "NOT_AVAILABLE"
-        nhbc = next((f for f in features if 'nhbc' in f.lower() or 'warranty' in f.lower()), "NOT_AVAILABLE")
-
-        dims = fn_extract_floor_dimensions(html_type, base)
-        b, ba, l = fn_count_rooms(dims)
-        bd = f"{b} Bedroom" if b else "NOT_AVAILABLE"
-        ab = f"{ba} Bathroom" if ba else "NOT_AVAILABLE"
-        lr = f"{l} Living Room" if l else "NOT_AVAILABLE"
-
-        plots = []
+        stats = fn_track_transfer(context, page)
+        response = page.goto(type_url, timeout=RENDER_POLICY.timeout * 1000)
+        if response is not None and response.status in RETRYABLE_STATUSES:
+            raise RuntimeError(f"status {response.status}")
+        if response is not None and response.status >= 400:
+            raise RetryError(f"Status {response.status} for {type_url}")
+        # Missing page sections are a content problem, not a host failure: keep the HTML
+        try:
+            page.wait_for_selector('div.column[data-read-more-outer]', timeout=10000, state="attached")
+        except Exception as e:
+            logging.warning(f"Could not find features for {type_url}: {e}")
         try:
             page.wait_for_selector('table.plots', timeout=10000, state="attached")
-            html_plot = page.content()
-            soup_plot = BeautifulSoup(html_plot, 'html.parser')
-            
-            # Find all plot rows in the tables
-            for row in soup_plot.select('table.plots tr.plot-row'):
-                # Get the house style from the data attribute
-                style = row.get('data-house-style', '').strip()
-                
-                # Only include rows matching the current type_name (style slug)
-                if style.lower() != style_slug.lower():
-                    continue
-                
-                try:
-                    # Extract plot number (first column) - e.g., "Plot 44"
-                    plot_cell = row.select_one('td:nth-child(1) span')
-                    num = plot_cell.get_text(strip=True) if plot_cell else "NOT_AVAILABLE"
-                    num = num if num and num != "" else "NOT_AVAILABLE"
-                    
-                    # Extract house type (second column) - e.g., "Mid Terrace"
-                    type_cell = row.select_one('td:nth-child(2) span')
-                    typ = type_cell.get_text(strip=True) if type_cell else "NOT_AVAILABLE"
-                    typ = typ if typ and typ != "" else "NOT_AVAILABLE"
-                    
-                    # Extract price (third column) - e.g., "£289,995" or "Awaiting release"
-                    price_cell = row.select_one('td:nth-child(3) .table-text-container span')
-                    pri = price_cell.get_text(strip=True) if price_cell else "NOT_AVAILABLE"
-                    pri = pri if pri and pri != "" else "NOT_AVAILABLE"
-                    
-                    # Determine availability based on price
-                    if pri == "NOT_AVAILABLE" or 'awaiting release' in pri.lower():
-                        avail = 'Not Released'
-                    elif pri.startswith('£') or pri[0].isdigit():
-                        avail = 'For Sale'
-                    else:
-                        avail = 'Not Released'
-                    
-                    if num != "NOT_AVAILABLE":
-                        plots.append({
-                            "PLOT": num, 
-                            "PROPERTY_TYPE": typ, 
-                            "PRICE_LATEST": pri, 
-                            "AVAILABILITY": avail
-                        })
-                        logging.info(f"Found plot: {num} - {typ} - {pri} - {avail}")
-                except Exception as parse_err:
-                    logging.warning(f"Error parsing individual plot row: {parse_err}")
-                    continue
-                    
         except Exception as e:
             logging.warning(f"Could not parse plots for {type_url}: {e}")
+        return page.content(), stats
+    finally:
+        try:
+            page.close()
+        except Exception as e:
+            logging.warning(f"Error closing page: {e}")
+
+def fn_render_type_page(context, type_url):
+    """Render a house type page and return its HTML, or None if it failed to load."""
+    try:
+        html, stats = call_with_retry(type_url, lambda: fn_render_once(context, type_url), RENDER_POLICY)
+    except RetryError as e:
+        logging.error(f"Failed to load or render {type_url}: {e}")
+        return None
+
+    render_stats["pages"] += 1
+    for key in ("bytes", "requests", "cached"):
+        render_stats[key] += stats[key]
+    logging.info(
+        f"Rendered {type_url}: {stats['bytes'] / 1024:.0f} KiB transferred, "
+        f"{stats['cached']}/{stats['requests']} requests from cache",
+        extra={"sample": "render"},
+    )
+    return html
 
-        return feat_str, nhbc, dims, bd, ab, lr, plots
+def fn_parse_plot_rows(soup, style_slug):
+    """Extract plot rows for one house style from the plots table."""
+    plots = []
+    # Find all plot rows in the tables
+    for row in soup.select('table.plots tr.plot-row'):
+        # Get the house style from the data attribute
+        style = row.get('data-house-style', '').strip()
 
+        # Only include rows matching the current type_name (style slug)
+        if style.lower() != style_slug.lower():
+            continue
+
+        try:
+            # Extract plot number (first column) - e.g., "Plot 44"
+            plot_cell = row.select_one('td:nth-child(1) span')
+            num = plot_cell.get_text(strip=True) if plot_cell else "NOT_AVAILABLE"
+            num = num if num and num != "" else "NOT_AVAILABLE"
+
+            # Extract house type (second column) - e.g., "Mid Terrace"
+            type_cell = row.select_one('td:nth-child(2) span')
+            typ = type_cell.get_text(strip=True) if type_cell else "NOT_AVAILABLE"
+            typ = typ if typ and typ != "" else "NOT_AVAILABLE"
+
+            # Extract price (third column) - e.g., "£289,995" or "Awaiting release"
+            price_cell = row.select_one('td:nth-child(3) .table-text-container span')
+            pri = price_cell.get_text(strip=True) if price_cell else "NOT_AVAILABLE"
+            pri = pri if pri and pri != "" else "NOT_AVAILABLE"
+
+            # Determine availability based on price
+            if pri == "NOT_AVAILABLE" or 'awaiting release' in pri.lower():
+                avail = 'Not Released'
+            elif pri.startswith('£') or pri[0].isdigit():
+                avail = 'For Sale'
+            else:
+                avail = 'Not Released'
+
+            if num != "NOT_AVAILABLE":
+                plots.append({
+                    "PLOT": num,
+                    "PROPERTY_TYPE": typ,
+                    "PRICE_LATEST": pri,
+                    "AVAILABILITY": avail
+                })
+                logging.info(f"Found plot: {num} - {typ} - {pri} - {avail}", extra={"sample": "plot"})
+        except Exception as parse_err:
+            logging.warning(f"Error parsing individual plot row: {parse_err}")
+            continue
+    return plots
+
+def fn_type_style_slug(soup, type_name):
+    # First, extract the actual TYPE name from the page title
+    actual_type_name = type_name
+    title_h1 = soup.select_one('main.house-development h1')
+    if title_h1:
+        actual_type_name = title_h1.get_text(strip=True)
+        logging.info(f"Found page TYPE name: {actual_type_name}", extra={"sample": "type_name"})
+
+    # Convert type name to data-house-style format (e.g., "The Kinloch" -> "the-kinloch")
+    style_slug = actual_type_name.lower().replace(" ", "-")
+    logging.info(f"Looking for plots with style slug: {style_slug}", extra={"sample": "style_slug"})
+    return style_slug
+
+def fn_parse_type_page(html_type, type_name, base):
+    """Extract features, warranty, dimensions, room counts and plots from rendered type page HTML."""
+    soup = fn_soup(html_type)
+    style_slug = fn_type_style_slug(soup, type_name)
+
+    features = []
+    fdiv = soup.find('div', class_='column', attrs={'data-read-more-outer': True})
+    if fdiv:
+        for li in fdiv.find_all('li'):
+            txt = li.get_text(strip=True)
+            if txt and txt not in features:
+                features.append(txt)
+        templates = fdiv.find_all('template', attrs={'x-if': 'showMoreFeatures'})
+        for tmpl in templates:
+            tsoup = fn_soup(tmpl.decode_contents())
+            for li in tsoup.find_all('li'):
+                txt = li.get_text(strip=True)
+                if txt and txt not in features:
+                    features.append(txt)
+
+    feat_str = " / ".join(features) if features else "NOT_AVAILABLE"
+    feature_tags = BELLWAY_CLASSIFIER.classify_lines(features)
+    nhbc = next((f for f, tags in zip(features, feature_tags) if "warranty" in tags), "NOT_AVAILABLE")
+
+    dims = fn_extract_floor_dimensions(html_type, base)
+    b, ba, l = fn_count_rooms(dims)
+    bd = f"{b} Bedroom" if b else "NOT_AVAILABLE"
+    ab = f"{ba} Bathroom" if ba else "NOT_AVAILABLE"
+    lr = f"{l} Living Room" if l else "NOT_AVAILABLE"
+
+    plots = fn_parse_plot_rows(soup, style_slug)
+    return feat_str, nhbc, dims, bd, ab, lr, plots
+
+def fn_type_page_result(html_type, type_url, type_name, base):
+    """Parse rendered type page HTML, falling back to defaults when rendering or parsing failed."""
+    if html_type is None:
+        return base["FEATURES"], base["NHBC_WARRANTY"], {}, base["BEDROOM"], base["BATHROOM"], base["LIVING_ROOM"], []
+    try:
+        return fn_parse_type_page(html_type, type_name, base)
     except Exception as e:
         logging.error(f"Error processing {type_url}: {e}")
         return "NOT_AVAILABLE", "NOT_AVAILABLE", {}, "NOT_AVAILABLE", "NOT_AVAILABLE", "NOT_AVAILABLE", []
-    
-    finally:
-        if browser:
-            try:
-                browser.close()
-            except Exception as e:
-                logging.warning(f"Error closing browser: {e}")
 
 
-def main():
-    global base_info
-    logging.info("=== Starting Bellway Scraper ===")
+def fn_join_dimensions(lines):
+    return "\n".join([d for d in lines if d and d != "NOT_AVAILABLE"]) or "NOT_AVAILABLE"
+
+# --- Streaming crawl pipeline: regions -> developments -> types -> plot rows -> sink ---
+# Each stage is a generator pulling one item at a time from the previous stage,
+# so at most one region/development/type/row is buffered per stage and peak
+# memory does not grow with the number of plots.
+
+def fn_iter_regions(loc_url, targets):
+    regions = fn_scrape_map_regions(loc_url)
+    logging.info(f"Found {len(regions)} regions from map.")
+    for reg in regions:
+        if not targets.matches_region(reg['name']):
+            continue
+        logging.info(f"Scraping region: {reg['name']}")
+        yield reg
+
+def fn_iter_developments(regions):
+    for reg in regions:
+        devs = fn_scrape_developments_from_tiles(reg['url'])
+        logging.info(f"  Found {len(devs)} developments in region: {reg['name']}")
+        for dev in devs:
+            yield reg, dev
+
+def fn_build_development(base, region_name, dev, html):
+    """Return (dev_base, types) for a development page: base info stamped with development-level fields."""
+    dev_base = base.copy()
+    proximity, parking = fn_extract_proximity_and_parking(html, dev_base)
+    addr, pc, locn, price_range, types = fn_scrape_development_details(dev['url'], dev_base, html)
+    logging.info(f"    Found {len(types)} property types in development.")
+    dev_base.update({
+        "OUTLET": dev['name'],
+        "REGION": region_name,
+        "ADDRESS": addr,
+        "LOCATION": locn,
+        "POSTCODE": pc,
+        "PRICE_RANGE": price_range,
+        "PROXIMITY": proximity,
+        "PARKING_CONFIGURATION": parking,
+    })
+    return dev_base, types
+
+def fn_type_rows(dev_base, tp, parsed):
+    """Yield one PlotRecord per plot of a house type (or a single NO_PLOTS row)."""
+    feat, nhbc, dims, bd, ba, lr, plots = parsed
+    type_record = PlotRecord.from_dict(dev_base).derive({
+        "TYPE": tp['name'],
+        "FEATURES": feat,
+        "GROUND_FLOOR_DIMENSIONS": fn_join_dimensions(dims.get("GROUND_FLOOR_DIMENSIONS", [])),
+        "FIRST_FLOOR_DIMENSIONS": fn_join_dimensions(dims.get("FIRST_FLOOR_DIMENSIONS", [])),
+        "SECOND_FLOOR_DIMENSIONS": fn_join_dimensions(dims.get("SECOND_FLOOR_DIMENSIONS", [])),
+        "BEDROOM": bd,
+        "BATHROOM": ba,
+        "LIVING_ROOM": lr,
+        "NHBC_WARRANTY": nhbc,
+        "URL": tp['url']
+    })
+
+    if plots:
+        for pl in plots:
+            yield type_record.derive({
+                "PROPERTY_TYPE": pl["PROPERTY_TYPE"],
+                "PLOT": pl["PLOT"],
+                "PRICE_LATEST": pl["PRICE_LATEST"],
+                "AVAILABILITY": pl["AVAILABILITY"],
+            })
+    else:
+        yield type_record.derive({
+            "PROPERTY_TYPE": tp['name'],
+            "PLOT": "NO_PLOTS",
+            "PRICE_LATEST": "Awaiting release",
+            "AVAILABILITY": "Not Released",
+        })
+
+def fn_budget_exhausted(what):
+    if budget is None or not budget.exhausted():
+        return False
+    logging.warning(f"Time budget of {budget.seconds / 60:g} minutes used up; not starting {what}")
+    budget.stopped_early = True
+    return True
+
+def fn_iter_types(developments, base, targets):
+    for reg, dev in developments:
+        if fn_budget_exhausted(f"{dev['name']} or later developments"):
+            return
+        logging.info(f"  Scraping development: {dev['name']} - {dev['url']}")
+        resp = fn_fetch_page_data(dev['url'])
+        if not resp:
+            continue
+        fn_archive_page(dev['url'], resp.text, "development", region=reg['name'], name=dev['name'])
+        dev_base, types = fn_build_development(base, reg['name'], dev, resp.text)
+        if not targets.matches_postcode(dev_base["POSTCODE"]):
+            logging.info(f"    Skipping {dev['name']}: postcode {dev_base['POSTCODE']} not targeted")
+            continue
+        if crawl_state is not None:
+            # The development's own timestamp only covers its page; its freshness comes from its types
+            crawl_state.record(dev['url'], fingerprint([(dev_base["PRICE_RANGE"],)] + [(tp['url'],) for tp in types]),
+                               children=[tp['url'] for tp in types])
+        if budget is not None:
+            types = crawl_state.rank(types, key=lambda tp: tp['url'])
+        only_types = dev.get('only_types')
+        for tp in types:
+            if only_types is not None and tp['url'].rstrip('/') not in only_types:
+                continue
+            if fn_budget_exhausted(f"remaining house types of {dev['name']}"):
+                return
+            yield dev, dev_base, tp
+        profiling.mark(f"development {dev['name']}")
+
+# Rendered pages queued for a parser process, per worker; bounds memory held in raw HTML
+PARSE_INFLIGHT_PER_WORKER = 2
+
+def fn_start_parse_pool(workers):
+    """Start the parser processes up front, before Playwright spawns its own threads and processes."""
+    from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=logsetup.init_worker_logging,
+                               initargs=logsetup.worker_initargs())
+    pool.submit(int).result()
+    logging.info(f"Started {workers} HTML parser processes")
+    return pool
+
+def fn_iter_plot_rows(context, types, parse_pool=None, parse_workers=0):
+    """Render type pages and yield their rows; with a parse pool, rendering continues while earlier pages are parsed."""
+    pending = deque()
+    max_inflight = max(1, parse_workers * PARSE_INFLIGHT_PER_WORKER)
+    for dev, dev_base, tp in types:
+        logging.info(f"    Scraping house type: {tp['name']} - {tp['url']}")
+        html_type = fn_render_type_page(context, tp['url'])
+        if html_type is not None:
+            fn_archive_page(tp['url'], html_type, "type", development=dev['url'])
+
+        rendered = html_type is not None
+
+        if parse_pool is None:
+            parsed = fn_type_page_result(html_type, tp['url'], tp['name'], dev_base)
+            yield from fn_record_type(dev, tp, fn_type_rows(dev_base, tp, parsed), rendered)
+            continue
+
+        future = parse_pool.submit(fn_type_page_result, html_type, tp['url'], tp['name'], dev_base)
+        pending.append((future, dev, dev_base, tp, rendered))
+        # Emit finished pages in crawl order; block only when the queue is full
+        while pending and (len(pending) >= max_inflight or pending[0][0].done()):
+            future, done_dev, done_base, done_tp, done_rendered = pending.popleft()
+            yield from fn_record_type(done_dev, done_tp, fn_type_rows(done_base, done_tp, future.result()), done_rendered)
+
+    while pending:
+        future, done_dev, done_base, done_tp, done_rendered = pending.popleft()
+        yield from fn_record_type(done_dev, done_tp, fn_type_rows(done_base, done_tp, future.result()), done_rendered)
+
+def fn_record_type(dev, tp, rows, rendered):
+    """Pass a house type's rows through, then record the page in the crawl state if it rendered."""
+    plots = []
+    for row in rows:
+        plots.append((row["PLOT"], row["PRICE_LATEST"], row["AVAILABILITY"]))
+        yield row
+    if crawl_state is not None and rendered:
+        for_sale = sum(1 for plot in plots if plot[2] == "For Sale")
+        crawl_state.record(tp['url'], fingerprint(plots), for_sale, parent=dev['url'])
+
+# --- Offline re-extraction from a page archive ---
+
+def fn_init_replay_worker(postcodes, *log_args):
+    """Replay pool initializer: go offline and load the archived postcode lookups once per worker."""
+    global offline
+    offline = True
+    postcode_cache.update(postcodes)
+    logsetup.init_worker_logging(*log_args)
+
+def fn_replay_development(job):
+    """Worker: rebuild all rows of one archived development without network access."""
+    root, run_id, dev_entry, type_entries = job
+
     base = fn_get_base_info()
-    base_info = base
+    base["RUN_DATE"] = run_id
+    meta = dev_entry["meta"]
+    dev = {'name': meta.get("name", "NOT_AVAILABLE"), 'url': dev_entry["url"]}
+    dev_html = read_blob(dev_entry["sha256"], dev_entry["codec"], root)
+    dev_base, types = fn_build_development(base, meta.get("region", "NOT_AVAILABLE"), dev, dev_html)
+
+    rows = []
+    for tp in types:
+        entry = type_entries.get(tp['url'])
+        html_type = read_blob(entry["sha256"], entry["codec"], root) if entry else None
+        parsed = fn_type_page_result(html_type, tp['url'], tp['name'], dev_base)
+        rows.extend(fn_type_rows(dev_base, tp, parsed))
+    return rows
+
+def fn_replay(args):
+    global sink
+    root, run_id = args.archive_dir, args.replay
+    devs, types, postcodes = [], {}, {}
+    for entry in iter_manifest(run_id, root):
+        if entry["kind"] == "development":
+            devs.append(entry)
+        elif entry["kind"] == "type":
+            types.setdefault(entry["meta"].get("development"), {})[entry["url"]] = entry
+        elif entry["kind"] == "postcode":
+            postcodes[entry["meta"]["postcode"]] = json.loads(read_blob(entry["sha256"], entry["codec"], root))
+    logging.info(f"Replaying {len(devs)} archived developments from run {run_id}")
+
+    jobs = [(root, run_id, dev, types.get(dev["url"], {})) for dev in devs]
+    sink = CsvSink(f"mpi_bellway_replay_{run_id}_{RUN_DATE}.csv", list(fn_get_base_info().keys()))
+    if args.sqlite:
+        sink = TeeSink(sink, SqliteSink(args.sqlite))
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count(), initializer=fn_init_replay_worker,
+                                 initargs=(postcodes, *logsetup.worker_initargs())) as pool:
+            for rows in pool.map(fn_replay_development, jobs, chunksize=4):
+                for row in rows:
+                    sink.write(row)
+        logging.info("Replay completed successfully.")
+    finally:
+        sink.close()
+
+# Sitemap path patterns: /new-homes/<region>/<development>[/<house-type>]
+SITEMAP_PATTERNS = {
+    "type": re.compile(r'^/new-homes/([^/]+)/([^/]+)/([^/]+)/?$'),
+    "development": re.compile(r'^/new-homes/([^/]+)/([^/]+)/?$'),
+}
+
+REGION_PATH_PATTERN = re.compile(r'^/new-homes/([^/]+)/?$')
+
+def fn_slug_to_name(slug):
+    return slug.replace('-', ' ').title()
+
+def fn_developments_from_urls(urls):
+    """Map explicit region, development and house type URLs straight to (region, development) pairs."""
+    found = {}
+    for url in urls:
+        path = urlparse(url).path
+        m = SITEMAP_PATTERNS["type"].match(path) or SITEMAP_PATTERNS["development"].match(path)
+        if not m:
+            m = REGION_PATH_PATTERN.match(path)
+            if m:
+                reg = {'name': fn_slug_to_name(m.group(1)), 'url': url}
+                for dev in fn_scrape_developments_from_tiles(url):
+                    found.setdefault(dev['url'].rstrip('/'), (reg, dict(dev, only_types=None)))
+            else:
+                logging.warning(f"Skipping unrecognised target URL: {url}")
+            continue
+
+        region_slug, dev_slug = m.group(1, 2)
+        dev_url = f"{BASE_URL}/new-homes/{region_slug}/{dev_slug}"
+        reg = {'name': fn_slug_to_name(region_slug), 'url': f"{BASE_URL}/new-homes/{region_slug}"}
+        _, dev = found.setdefault(dev_url, (reg, {'name': fn_slug_to_name(dev_slug), 'url': dev_url, 'only_types': set()}))
+        if m.re is SITEMAP_PATTERNS["development"]:
+            dev['only_types'] = None
+        elif dev['only_types'] is not None:
+            dev['only_types'].add(f"{BASE_URL}{path}".rstrip('/'))
+    logging.info(f"Resolved {len(found)} target developments from URLs.")
+    return list(found.values())
+
+def fn_discover_developments_from_sitemap():
+    """Return [(region, development)] from the sitemap, most recently changed first, or None if unavailable."""
+    from sitemap import find_sitemaps, iter_sitemap, classify_entries
+    logging.info("Discovering developments from sitemap...")
+    entries = (entry for sm in find_sitemaps(BASE_URL, HEADERS) for entry in iter_sitemap(sm, HEADERS))
+    grouped = classify_entries(entries, SITEMAP_PATTERNS)
+    if not grouped["development"]:
+        return None
+
+    # A development counts as changed when its page or any of its house type pages changed
+    type_lastmod = {}
+    for _, lastmod, m in grouped["type"]:
+        key = m.group(1, 2)
+        if lastmod and lastmod > type_lastmod.get(key, ""):
+            type_lastmod[key] = lastmod
+
+    found = []
+    for loc, lastmod, m in grouped["development"]:
+        region_slug, dev_slug = m.group(1, 2)
+        newest = max(filter(None, [lastmod, type_lastmod.get((region_slug, dev_slug))]), default=None)
+        reg = {'name': fn_slug_to_name(region_slug), 'url': f"{BASE_URL}/new-homes/{region_slug}"}
+        dev = {'name': fn_slug_to_name(dev_slug), 'url': loc}
+        found.append((newest, reg, dev))
+    found.sort(key=lambda item: (item[0] is None, item[0] or ""), reverse=True)
+    logging.info(f"Found {len(found)} developments in sitemap.")
+    return [(reg, dev) for _, reg, dev in found]
+
+def fn_discover_developments(args, targets):
+    """Return an iterable of (region, development) pairs, or None if nothing can be crawled."""
+    # Explicit URLs jump straight to their subtrees; site-wide discovery is only
+    # needed when regions are named or no URLs were given.
+    from_urls = fn_developments_from_urls(targets.urls) if targets.urls else []
+    if targets.urls and not targets.regions:
+        return from_urls
+
+    if args.discovery == "sitemap":
+        developments = fn_discover_developments_from_sitemap()
+        if developments is not None:
+            matched = [(reg, dev) for reg, dev in developments if targets.matches_region(reg['name'])]
+            return list(fn_merge_developments(from_urls, matched))
+        logging.warning("No development URLs found in sitemap, falling back to navigation crawl")
 
     # Ensure location URL is retrieved
     loc = fn_get_our_locations_url()
     if not loc:
         logging.error("Cannot find locations URL")
+        return from_urls or None
+    return fn_merge_developments(from_urls, fn_iter_developments(fn_iter_regions(loc, targets)))
+
+def fn_merge_developments(from_urls, discovered):
+    """Explicit URL targets first, then discovered developments not already listed (so --url with --region never scrapes one twice)."""
+    seen = {dev['url'].rstrip('/') for _, dev in from_urls}
+    yield from from_urls
+    for reg, dev in discovered:
+        key = dev['url'].rstrip('/')
+        if key in seen:
+            continue
+        seen.add(key)
+        yield reg, dev
+
+# --- Price and availability polling ---
+# Re-reads only the plot tables of the house type pages listed in the last full
+# snapshot and reports what changed. Features, dimensions, room counts and
+# geocoding are skipped, and Playwright is only started for pages whose plot
+# table is not present in the plain HTML.
+
+CHANGE_COLUMNS = ["REGION", "OUTLET", "TYPE", "PLOT", "CHANGE", "OLD_PRICE", "PRICE_LATEST",
+                  "OLD_AVAILABILITY", "AVAILABILITY", "URL", "RUN_DATE"]
+
+def fn_find_last_snapshot():
+    snapshots = [f for f in glob.glob("mpi_bellway_*.csv") if SNAPSHOT_PATTERN.match(os.path.basename(f))]
+    return max(snapshots, key=os.path.getmtime) if snapshots else None
+
+def fn_load_snapshot(path, targets):
+    """Return ({type URL: first row}, {type URL: {(OUTLET, TYPE, PLOT): row}}) for the targeted part of a snapshot."""
+    type_pages, plots = {}, {}
+    url_prefixes = tuple(u.rstrip('/') for u in targets.urls)
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if not (targets.matches_region(row["REGION"]) and targets.matches_postcode(row["POSTCODE"])):
+                continue
+            if url_prefixes and not row["URL"].startswith(url_prefixes):
+                continue
+            type_pages.setdefault(row["URL"], row)
+            page_plots = plots.setdefault(row["URL"], {})
+            if row["PLOT"] != "NO_PLOTS":
+                page_plots[(row["OUTLET"], row["TYPE"], row["PLOT"])] = row
+    return type_pages, plots
+
+def fn_change_row(row, change, old=None, new=None):
+    return {
+        "REGION": row["REGION"], "OUTLET": row["OUTLET"], "TYPE": row["TYPE"], "PLOT": row["PLOT"],
+        "CHANGE": change,
+        "OLD_PRICE": old["PRICE_LATEST"] if old else "NOT_AVAILABLE",
+        "PRICE_LATEST": new["PRICE_LATEST"] if new else "NOT_AVAILABLE",
+        "OLD_AVAILABILITY": old["AVAILABILITY"] if old else "NOT_AVAILABLE",
+        "AVAILABILITY": new["AVAILABILITY"] if new else "NOT_AVAILABLE",
+        "URL": row["URL"], "RUN_DATE": RUN_DATE,
+    }
+
+def fn_poll(args):
+    global sink
+    snapshot = args.snapshot or fn_find_last_snapshot()
+    if not snapshot:
+        logging.error("No full snapshot (mpi_bellway_<run>.csv) found to poll against")
         return
+    targets = CrawlTargets.from_args(args)
+    type_pages, previous_plots = fn_load_snapshot(snapshot, targets)
+    logging.info(f"Polling {len(type_pages)} house type pages against {snapshot}")
 
-    with sync_playwright() as p:
+    sink = CsvSink(CHANGES_CSV, CHANGE_COLUMNS)
+    context = None
+    with ExitStack() as stack:
+        stack.callback(sink.close)
         try:
-            # Use the new map-based region scraping
-            regions = fn_scrape_map_regions(loc)
-            logging.info(f"Found {len(regions)} regions from map.")
-            
-            for reg in regions:
-                logging.info(f"Scraping region: {reg['name']}")
-                # Use the new tile-based development scraping
-                devs = fn_scrape_developments_from_tiles(reg['url'])
-                logging.info(f"  Found {len(devs)} developments in region: {reg['name']}")
-
-                for dev in devs:
-                    logging.info(f"  Scraping development: {dev['name']} - {dev['url']}")
-                    resp = fn_fetch_page_data(dev['url'])
-                    if resp:
-                        proximity, parking = fn_extract_proximity_and_parking(resp.text, base)
-
-                        addr, pc, locn, price_range, types = fn_scrape_development_details(dev['url'], base)
-                        logging.info(f"    Found {len(types)} property types in development.")
-
-                        for tp in types:
-                            logging.info(f"    Scraping house type: {tp['name']} - {tp['url']}")
-                            feat, nhbc, dims, bd, ba, lr, plots = fn_scrape_type_page(p, tp['url'], tp['name'], base)
-
-                            # Prepare dimensions for saving
-                            ground_dims = dims.get("GROUND_FLOOR_DIMENSIONS", [])
-                            first_dims = dims.get("FIRST_FLOOR_DIMENSIONS", [])
-                            second_dims = dims.get("SECOND_FLOOR_DIMENSIONS", [])
-                            
-                            # Filter out "NOT_AVAILABLE" and join remaining dimensions
-                            # ground_dim_str = "\n".join([d for d in ground_dims if d and d != "NOT_AVAILABLE"]) if ground_dims else ""
-                            # first_dim_str = "\n".join([d for d in first_dims if d and d != "NOT_AVAILABLE"]) if first_dims else ""
-                            # second_dim_str = "\n".join([d for d in second_dims if d and d != "NOT_AVAILABLE"]) if second_dims else ""
-                            ground_dim_str = "\n".join([d for d in ground_dims if d and d != "NOT_AVAILABLE"]) or "NOT_AVAILABLE"
-                            first_dim_str = "\n".join([d for d in first_dims if d and d != "NOT_AVAILABLE"]) or "NOT_AVAILABLE"
-                            second_dim_str = "\n".join([d for d in second_dims if d and d != "NOT_AVAILABLE"]) or "NOT_AVAILABLE"
-
-                            if plots:
-                                for pl in plots:
-                                    entry = base.copy()
-                                    entry.update({
-                                        "OUTLET": dev['name'], 
-                                        "REGION": reg['name'],
-                                        "ADDRESS": addr, 
-                                        "LOCATION": locn, 
-                                        "POSTCODE": pc,
-                                        "COUNTY": base["COUNTY"],
-                                        "CITY": base["CITY"],
-                                        "TYPE": tp['name'], 
-                                        "PROPERTY_TYPE": pl["PROPERTY_TYPE"],
-                                        "PLOT": pl["PLOT"],
-                                        "PRICE_RANGE": price_range, 
-                                        "PRICE_LATEST": pl["PRICE_LATEST"],
-                                        "AVAILABILITY": pl["AVAILABILITY"], 
-                                        "FEATURES": feat,
-                                        "PROXIMITY": proximity, 
-                                        "PARKING_CONFIGURATION": parking,
-                                        "GROUND_FLOOR_DIMENSIONS": ground_dim_str,
-                                        "FIRST_FLOOR_DIMENSIONS": first_dim_str,
-                                        "SECOND_FLOOR_DIMENSIONS": second_dim_str,
-                                        "BEDROOM": bd, 
-                                        "BATHROOM": ba, 
-                                        "LIVING_ROOM": lr,
-                                        "NHBC_WARRANTY": nhbc, 
-                                        "LONGITUDE": base["LONGITUDE"],
-                                        "LATITUDE": base["LATITUDE"],
-                                        "URL": tp['url']
-                                    })
-                                    rows.append(entry)
-                            else:
-                                entry = base.copy()
-                                entry.update({
-                                    "OUTLET": dev['name'], 
-                                    "REGION": reg['name'],
-                                    "ADDRESS": addr, 
-                                    "LOCATION": locn, 
-                                    "POSTCODE": pc,
-                                    "COUNTY": base["COUNTY"], 
-                                    "CITY": base["CITY"],
-                                    "TYPE": tp['name'],
-                                    "PROPERTY_TYPE": tp['name'],
-                                    "PLOT": "NO_PLOTS", 
-                                    "PRICE_RANGE": price_range, 
-                                    "PRICE_LATEST": "Awaiting release",
-                                    "AVAILABILITY": "Not Released", 
-                                    "FEATURES": feat,
-                                    "PROXIMITY": proximity, 
-                                    "PARKING_CONFIGURATION": parking,
-                                    "GROUND_FLOOR_DIMENSIONS": ground_dim_str, 
-                                    "FIRST_FLOOR_DIMENSIONS": first_dim_str,
-                                    "SECOND_FLOOR_DIMENSIONS": second_dim_str,
-                                    "BEDROOM": bd, 
-                                    "BATHROOM": ba, 
-                                    "LIVING_ROOM": lr,
-                                    "NHBC_WARRANTY": nhbc, 
-                                    "LONGITUDE": base["LONGITUDE"],
-                                    "LATITUDE": base["LATITUDE"],
-                                    "URL": tp['url']
-                                })
-                                rows.append(entry)
-                    
-                    # Save progress every 100 records
-                    if len(rows) % 100 == 0:
-                        fn_save_csv(rows, base)
-
-            logging.info("Scraping completed successfully.")
+            for url, type_row in type_pages.items():
+                fn_human_delay()
+                resp = fn_fetch_page_data(url)
+                soup = fn_soup(resp.text) if resp else None
+                if soup is not None and soup.select_one('table.plots') is None:
+                    # Plot table is filled in client-side on this page; render it
+                    if context is None:
+                        from playwright.sync_api import sync_playwright
+                        browser, context = fn_open_browser_context(
+                            stack.enter_context(sync_playwright()), args.browser_profile, args.browser_cache_mb)
+                        stack.callback(fn_close_browser_context, browser, context)
+                    html = fn_render_type_page(context, url)
+                    soup = fn_soup(html) if html is not None else None
+                if soup is None:
+                    logging.warning(f"Skipping {url}: could not load page")
+                    continue
+
+                previous = previous_plots[url]
+                seen = set()
+                for pl in fn_parse_plot_rows(soup, fn_type_style_slug(soup, type_row["TYPE"])):
+                    key = (type_row["OUTLET"], type_row["TYPE"], pl["PLOT"])
+                    seen.add(key)
+                    row = dict(type_row, PLOT=pl["PLOT"])
+                    old = previous.get(key)
+                    if old is None:
+                        sink.write(fn_change_row(row, "NEW", None, pl))
+                    else:
+                        price_changed = old["PRICE_LATEST"] != pl["PRICE_LATEST"]
+                        status_changed = old["AVAILABILITY"] != pl["AVAILABILITY"]
+                        if price_changed and status_changed:
+                            sink.write(fn_change_row(row, "PRICE_AND_STATUS", old, pl))
+                        elif price_changed:
+                            sink.write(fn_change_row(row, "PRICE", old, pl))
+                        elif status_changed:
+                            sink.write(fn_change_row(row, "STATUS", old, pl))
+
+                for key, old in previous.items():
+                    if key not in seen:
+                        sink.write(fn_change_row(old, "REMOVED", old, None))
+
+            logging.info(f"Polling completed: {sink.count} changes.")
         except KeyboardInterrupt:
-            logging.warning("Script interrupted by user")
-            fn_save_csv(rows, base)
-        except Exception as e:
-            logging.error(f"An error occurred: {e}")
-            fn_save_csv(rows, base)
-        finally:
-            fn_save_csv(rows, base)
+            logging.warning("Polling interrupted by user")
+
+def fn_crawl(args):
+    global sink, archive, crawl_state, budget
+    base = fn_get_base_info()
+    parse_pool = fn_start_parse_pool(args.parse_workers) if args.parse_workers else None
+    if args.archive:
+        archive = PageArchive(RUN_DATE, args.archive_dir)
+
+    targets = CrawlTargets.from_args(args)
+    if not targets.is_empty():
+        logging.info(f"Targeted refresh: {targets.describe()}")
+    crawl_state = CrawlState(args.state_file)
+    if args.schedule or args.budget:
+        budget = Budget(args.budget)
+
+    try:
+        developments = fn_discover_developments(args, targets)
+        if developments is None:
+            return
+        if budget is not None:
+            developments = crawl_state.rank(list(developments), key=lambda item: item[1]['url'])
+            logging.info(f"Scheduled {len(developments)} developments by staleness, change rate and plots for sale")
+            for _, dev in developments[:5]:
+                logging.info(f"  {dev['name']}: {crawl_state.describe(dev['url'])}")
+
+        sink = fn_open_csv_sink(base, targeted=not targets.is_empty(), db_path=args.sqlite)
+        from playwright.sync_api import sync_playwright
+        completed = False
+        with sync_playwright() as p:
+            browser = context = None
+            try:
+                browser, context = fn_open_browser_context(p, args.browser_profile, args.browser_cache_mb)
+                types = fn_iter_types(developments, base, targets)
+                for entry in fn_iter_plot_rows(context, types, parse_pool, args.parse_workers):
+                    sink.write(entry)
+
+                if budget is not None and budget.stopped_early:
+                    logging.warning(f"Stopped at the time budget; output kept as {PARTIAL_OUTPUT_CSV}")
+                else:
+                    completed = True
+                    logging.info("Scraping completed successfully.")
+            except KeyboardInterrupt:
+                logging.warning("Script interrupted by user")
+            except Exception as e:
+                logging.error(f"An error occurred: {e}")
+            finally:
+                sink.close()
+                fn_close_browser_context(browser, context)
+        if completed and targets.is_empty():
+            fn_publish_snapshot()
+    finally:
+        crawl_state.save()
+        if archive:
+            archive.close()
+        if parse_pool:
+            parse_pool.shutdown(cancel_futures=True)
+
+# --- Dry run ---
+
+CHECK_SCHEDULE_LIMIT = 10
+
+def fn_check(args):
+    """Print the work this invocation would do without touching the network or starting a browser."""
+    targets = CrawlTargets.from_args(args)
+    print(f"Bellway scraper check for run {RUN_DATE}")
+    print(f"  Targets: {targets.describe()}")
+    if args.replay:
+        path = manifest_path(args.archive_dir, args.replay)
+        entries = list(iter_manifest(args.replay, args.archive_dir)) if os.path.exists(path) else []
+        developments = sum(1 for entry in entries if entry["kind"] == "development")
+        print(f"  Mode: replay of {path} ({developments} developments, {len(entries)} archived pages)")
+        print(f"  Output: mpi_bellway_replay_{args.replay}_{RUN_DATE}.csv")
+    elif args.poll:
+        snapshot = args.snapshot or fn_find_last_snapshot()
+        if snapshot:
+            type_pages, _ = fn_load_snapshot(snapshot, targets)
+            print(f"  Mode: poll {len(type_pages)} house type pages against {snapshot}")
+        else:
+            print("  Mode: poll, but no full snapshot (mpi_bellway_<run>.csv) was found")
+        print(f"  Output: {CHANGES_CSV}")
+    else:
+        print(f"  Mode: crawl, {args.discovery} discovery, {args.parse_workers or 'inline'} parse workers")
+        if targets.is_empty():
+            print(f"  Output: {PARTIAL_OUTPUT_CSV}, renamed to {OUTPUT_CSV} if the crawl completes")
+        else:
+            print(f"  Output: {TARGETED_OUTPUT_CSV}")
+        if args.archive:
+            print(f"  Archive: {args.archive_dir}")
+        state = CrawlState(args.state_file)
+        known = [url for url, entry in state.items.items() if not entry.get("parent")]
+        if targets.regions:
+            known = [url for url in known if targets.matches_region(fn_region_slug(url) or "")]
+        print(f"  Crawl state: {len(state.items)} pages in {args.state_file}, {len(known)} developments")
+        if args.schedule or args.budget:
+            limit = f"{args.budget:g} minute budget" if args.budget else "no time limit"
+            if known:
+                print(f"  Schedule ({limit}); new developments found during discovery run first, then:")
+                for url in state.rank(known)[:CHECK_SCHEDULE_LIMIT]:
+                    print(f"    {url}: {state.describe(url)}")
+            else:
+                print(f"  Schedule ({limit}): no history yet, developments run in discovery order")
+    if args.sqlite:
+        print(f"  SQLite: {args.sqlite}")
+    loaded = [name for name in ("playwright", "bs4", "requests") if name in sys.modules]
+    print(f"  Startup: {(time.perf_counter() - STARTED_AT) * 1000:.1f} ms "
+          f"(loaded: {', '.join(loaded) or 'no browser, parser or HTTP modules'})")
+
+def fn_region_slug(url):
+    m = SITEMAP_PATTERNS["development"].match(urlparse(url).path)
+    return m.group(1) if m else None
+
+def fn_parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bellway new homes scraper")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run with cProfile and tracemalloc (writes bellway_profile_<run>.pstats)")
+    parser.add_argument("--discovery", choices=["nav", "sitemap"], default="nav",
+                        help="Find developments via the site navigation (default) or sitemap.xml, "
+                             "falling back to navigation when no sitemap is available")
+    parser.add_argument("--browser-profile", metavar="DIR",
+                        help="Persistent Chromium user-data directory so the HTTP cache is reused across runs")
+    parser.add_argument("--browser-cache-mb", type=int, default=256,
+                        help="Maximum Chromium disk cache size in MB (default: 256)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parse rendered type pages in N worker processes while the next page renders (default: inline)")
+    parser.add_argument("--archive", action="store_true",
+                        help="Store every fetched and rendered page in a compressed archive for offline replay")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR,
+                        help=f"Page archive directory (default: {ARCHIVE_DIR})")
+    parser.add_argument("--replay", metavar="RUN_ID",
+                        help="Re-run extraction over an archived run without network access")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes for --replay (default: all cores)")
+    parser.add_argument("--sqlite", nargs="?", const=DB_FILE, metavar="DB",
+                        help=f"Also upsert rows into a SQLite database (default: {DB_FILE})")
+    parser.add_argument("--json-log", action="store_true",
+                        help=f"Also write a structured JSON-lines log ({JSON_LOG_FILE})")
+    parser.add_argument("--no-log-sampling", action="store_true",
+                        help="Log every high-volume info line instead of sampling them")
+    parser.add_argument("--poll", action="store_true",
+                        help="Only re-read plot prices and availability and write changes against the last full snapshot")
+    parser.add_argument("--snapshot", metavar="CSV",
+                        help="Full snapshot to diff against in --poll mode (default: newest mpi_bellway_<run>.csv)")
+    parser.add_argument("--schedule", action="store_true",
+                        help="Crawl developments and house types stalest and most often changing first")
+    parser.add_argument("--budget", type=float, metavar="MINUTES",
+                        help="Stop starting new work after this many minutes (implies --schedule)")
+    parser.add_argument("--state-file", default=STATE_FILE,
+                        help=f"Per-page scrape history used for scheduling (default: {STATE_FILE})")
+    parser.add_argument("--check", "--dry-run", dest="check", action="store_true",
+                        help="List the planned work and startup time, then exit without network access")
+    add_target_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = fn_parse_args(argv)
+    if args.check:
+        fn_check(args)
+        return
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    signal.signal(signal.SIGINT, fn_handle_interrupt)
+    logsetup.setup_logging(LOG_FILE, JSON_LOG_FILE if args.json_log else None, sample=not args.no_log_sampling)
+    logging.info("=== Starting Bellway Scraper ===")
+    if args.profile:
+        profiling.start_profiling(f"bellway_profile_{RUN_DATE}")
+    try:
+        if args.replay:
+            fn_replay(args)
+        elif args.poll:
+            fn_poll(args)
+        else:
+            fn_crawl(args)
+    finally:
+        profiling.stop_profiling()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,46 @@
+import re
+from bisect import bisect_right
+
+# --- Single-pass keyword classification ---
+# Every keyword of every category is compiled into one alternation wrapped in a
+# lookahead, so a single finditer over a batch of lines reports the longest
+# keyword starting at each position (overlapping matches included). Shorter
+# keywords that are a prefix of a longer match are folded into that match's tags.
+
+
+class KeywordClassifier:
+    """Tags text lines with every category whose keywords occur in them (case-insensitive substring match)."""
+
+    def __init__(self, categories: dict):
+        by_keyword = {}
+        for category, keywords in categories.items():
+            for kw in keywords:
+                by_keyword.setdefault(kw.lower(), set()).add(category)
+
+        keywords = sorted(by_keyword, key=len, reverse=True)
+        self._tags = {}
+        for kw in keywords:
+            tags = set()
+            for other in keywords:
+                if kw.startswith(other):
+                    tags |= by_keyword[other]
+            self._tags[kw] = frozenset(tags)
+
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+
+    def classify(self, text: str) -> set:
+        return self.classify_lines([text])[0]
+
+    def classify_lines(self, lines) -> list:
+        """Return one set of category names per line, scanning the whole batch in one pass."""
+        lowered = [ln.lower() for ln in lines]
+        starts = []
+        pos = 0
+        for ln in lowered:
+            starts.append(pos)
+            pos += len(ln) + 1
+
+        tags = [set() for _ in lowered]
+        for m in self._pattern.finditer("\n".join(lowered)):
+            tags[bisect_right(starts, m.start()) - 1] |= self._tags[m.group(1)]
+        return tags
@@ -1,7 +1,11 @@
 from datetime import datetime
-from constant import NOT_AVAILABLE, RUN_DATE
+from constant import NOT_AVAILABLE, OUTPUT_COLUMNS, RUN_DATE
 
 OUTPUT_CSV = f"mpi_barratthomes_{RUN_DATE}.csv"
+# Partial runs get their own name so they are never mistaken for a full snapshot
+TARGETED_OUTPUT_CSV = f"mpi_barratthomes_targeted_{RUN_DATE}.csv"
+# A full crawl appends here (across resumes) and is renamed to OUTPUT_CSV once it completes
+PARTIAL_OUTPUT_CSV = f"mpi_barratthomes_partial_{RUN_DATE}.csv"
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0 Safari/537.36",
@@ -12,46 +16,14 @@ USER_AGENTS = [
 ]
 
 def get_base_info():
-        return {
+        info = dict.fromkeys(OUTPUT_COLUMNS, NOT_AVAILABLE)
+        info.update({
             "COMPANY_NAME": "Barratt Homes",
             "BRAND_NAME": "Barratt Homes",
             "SOURCE_SITE":"Barratt Homes",
-            "OUTLET": NOT_AVAILABLE,
-            "REGION": NOT_AVAILABLE,
-            "ADDRESS": NOT_AVAILABLE,
-            "AREA": NOT_AVAILABLE,
-            "SUB_AREA": NOT_AVAILABLE,
-            "COUNTY":NOT_AVAILABLE,
-            "CITY":NOT_AVAILABLE,
-            "LOCATION": NOT_AVAILABLE,
-            "POSTCODE": NOT_AVAILABLE,
-            "PLOT": NOT_AVAILABLE,
-            "TYPE": NOT_AVAILABLE,
-            "PROPERTY_TYPE":NOT_AVAILABLE,
-            "PRICE_RANGE": NOT_AVAILABLE,
-            "PRICE_LATEST": NOT_AVAILABLE,
-            "AVAILABILITY": NOT_AVAILABLE,
-            "BEDROOM": NOT_AVAILABLE,
-            "BATHROOM": NOT_AVAILABLE,
-            "LIVING_ROOM": NOT_AVAILABLE,
-            "GROUND_FLOOR_DIMENSIONS": NOT_AVAILABLE,
-            "FIRST_FLOOR_DIMENSIONS": NOT_AVAILABLE,
-            "SECOND_FLOOR_DIMENSIONS":NOT_AVAILABLE,
-            "LONGITUDE": NOT_AVAILABLE,
-            "LATITUDE": NOT_AVAILABLE,
-            "SCHEMES_OFFERS": NOT_AVAILABLE,
-            "SCHEMES_OFFERS_DATE":RUN_DATE,	
-            "EVENT":NOT_AVAILABLE,
-            "EVENT_DATE":NOT_AVAILABLE,
-            "FEATURES": NOT_AVAILABLE,
-            "TENURE": NOT_AVAILABLE,
-            "NHBC_WARRANTY": NOT_AVAILABLE,
-            "HBF_STAR_RATING": NOT_AVAILABLE,
-            "PARKING_CONFIGURATION": NOT_AVAILABLE,
-            "EXPECTED_COMPLETION_DATE": NOT_AVAILABLE,
-            "PROXIMITY": NOT_AVAILABLE,
+            "SCHEMES_OFFERS_DATE":RUN_DATE,
             "RUN_DATE": RUN_DATE,
-            "URL": NOT_AVAILABLE
-        }
+        })
+        return info
 
 columns_order = list(get_base_info().keys())
@@ -10,6 +10,17 @@ FIRST_FLOOR_ID = "2"
 
 RUN_DATE = datetime.now().strftime('%m_%d_%Y_%H_%M_%S')
 
+# Output column layout shared by every scraper (CSV, SQLite and PlotRecord slots)
+OUTPUT_COLUMNS = (
+    "COMPANY_NAME", "BRAND_NAME", "SOURCE_SITE", "OUTLET", "REGION", "ADDRESS", "AREA", "SUB_AREA",
+    "COUNTY", "CITY", "LOCATION", "POSTCODE", "PLOT", "TYPE", "PROPERTY_TYPE", "PRICE_RANGE",
+    "PRICE_LATEST", "AVAILABILITY", "BEDROOM", "BATHROOM", "LIVING_ROOM", "GROUND_FLOOR_DIMENSIONS",
+    "FIRST_FLOOR_DIMENSIONS", "SECOND_FLOOR_DIMENSIONS", "LONGITUDE", "LATITUDE", "SCHEMES_OFFERS",
+    "SCHEMES_OFFERS_DATE", "EVENT", "EVENT_DATE", "FEATURES", "TENURE", "NHBC_WARRANTY",
+    "HBF_STAR_RATING", "PARKING_CONFIGURATION", "EXPECTED_COMPLETION_DATE", "PROXIMITY",
+    "RUN_DATE", "URL",
+)
+
 VALID_ROOM_KEYWORDS = {
     "couch": {"living", "lounge", "family", "sitting", "drawing", "front", "common", "den"},
     "bathroom": {"bathroom", "ensuite", "en‑suite", "wc", "shower"}
@@ -1,9 +1,9 @@
 import logging
-import time
 import requests
 # from bs4 import BeautifulSoup
 from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
 from utils import get_headers
+from retry import RetryPolicy, RetryError, request_with_retry
 
 # Disable SSL verification warnings (can remove this if using valid certs)
 requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
@@ -13,25 +13,17 @@ class FetchFailed(Exception):
 
 
 def fetch_soup(url: str, retries: int = 3, backoff: int = 2):
-    for attempt in range(retries):
-        try:
-            logging.info(f"�� Fetching: {url}")
-            headers = get_headers()
-
-            response = requests.get(
-                url,
-                headers=headers,
-                timeout=10,
-                verify=False  # Only if your production SSL fails; otherwise, use verify=True
-            )
-
-            if response.status_code == 200:
-                return BeautifulSoup(response.text, "html.parser")
-            logging.warning(f"Non-200 status {response.status_code} on {url}")
-
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching {url} (attempt {attempt + 1}): {e}")
-
-        time.sleep(backoff ** attempt)
-
-    raise FetchFailed(f"Failed to fetch {url} after {retries} attempts.")
+    logging.info(f"�� Fetching: {url}", extra={"sample": "fetch"})
+    policy = RetryPolicy(attempts=retries, base_delay=backoff, timeout=10)
+    try:
+        response = request_with_retry(
+            url,
+            policy,
+            headers=get_headers(),
+            verify=False  # Only if your production SSL fails; otherwise, use verify=True
+        )
+    except RetryError as e:
+        logging.error(f"Error fetching {url}: {e}")
+        raise FetchFailed(f"Failed to fetch {url} after {retries} attempts.") from e
+
+    return BeautifulSoup(response.text, "html.parser")
@@ -0,0 +1,167 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+# --- Non-blocking logging ---
+# Callers only enqueue records; a QueueListener thread does the formatting and
+# file/console I/O. High-volume INFO lines are sampled per message type before
+# they are queued, and an optional JSON-lines log gives one structured record
+# per line for the run.
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+# Keep 1 in N INFO records tagged with extra={"sample": <key>} for these keys
+SAMPLE_RATES = {
+    "plot": 25,  # one line per plot row
+    "fetch": 10,  # one line per page request
+    "development": 10,
+    "region": 5,
+    "render": 10,  # per rendered page; the end-of-run summary is not tagged
+    "type_name": 10,  # per house type page parse
+    "style_slug": 10,
+    "already_scraped": 50,
+}
+
+_handlers = []
+_listeners = []
+_sampler = None
+_worker_queue = None
+_level = logging.INFO
+
+
+class SamplingFilter(logging.Filter):
+    """Pass 1 in N INFO-or-lower records per message type; warnings and errors always pass."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        key = getattr(record, "sample", None)
+        rate = self.rates.get(key)
+        if rate is None:
+            return True
+        with self._lock:
+            count = self.seen.get(key, 0)
+            self.seen[key] = count + 1
+        return count % rate == 0
+
+    def summary(self) -> dict:
+        """Number of suppressed records per sample key."""
+        with self._lock:
+            return {k: n - (n + self.rates[k] - 1) // self.rates[k] for k, n in self.seen.items() if n > 1}
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback in exc_text instead of folding it into the message."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+        record.exc_info = None  # tracebacks do not pickle across the worker queue
+        return record
+
+
+_exc_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_text or record.exc_info:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_file: str, json_log_file: str = None, level=logging.INFO, sample: bool = True):
+    """Route all logging through a background QueueListener; safe to call more than once."""
+    global _sampler, _level
+    if _listeners:
+        return
+    _level = level
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    _handlers.extend([file_handler, stream_handler])
+    if json_log_file:
+        json_handler = logging.FileHandler(json_log_file, encoding='utf-8')
+        json_handler.setFormatter(JsonFormatter())
+        _handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    if sample:
+        _sampler = SamplingFilter(SAMPLE_RATES)
+        queue_handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    atexit.register(stop_logging)
+
+
+def worker_initargs() -> tuple:
+    """initargs for init_worker_logging so worker processes log through this process's handlers."""
+    global _worker_queue
+    if _worker_queue is None and _listeners:
+        import multiprocessing
+        _worker_queue = multiprocessing.Queue(-1)
+        listener = logging.handlers.QueueListener(_worker_queue, *_handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+    return _worker_queue, _level, _sampler is not None
+
+
+def init_worker_logging(log_queue, level=logging.INFO, sample: bool = True):
+    """ProcessPoolExecutor initializer: replace inherited handlers with one feeding `log_queue`."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if log_queue is None:
+        return
+    queue_handler = StructuredQueueHandler(log_queue)
+    if sample:
+        queue_handler.addFilter(SamplingFilter(SAMPLE_RATES))
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener threads."""
+    if _sampler:
+        for key, dropped in _sampler.summary().items():
+            if dropped:
+                logging.info(f"Log sampling suppressed {dropped} '{key}' messages")
+    while _listeners:
+        _listeners.pop().stop()
+    for handler in _handlers:
+        handler.close()
+    _handlers.clear()
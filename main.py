@@ -1,26 +1,29 @@
+import time
+STARTED_AT = time.perf_counter()  # Startup time reported by --check
 import logging
+import os
 import sys
-import io
+import argparse
+import profiling
+import logsetup
+from urllib.parse import urlparse
+from targets import CrawlTargets, add_target_arguments
 from typing import Optional, Dict
-from utils import human_delay, load_scraped_urls, save_scraped_url, save_checkpoint, load_checkpoint, clear_checkpoint
-from config import columns_order
+from utils import human_delay, load_scraped_urls, save_scraped_url, save_checkpoint, load_checkpoint, clear_checkpoint, SCRAPED_LOG_FILE, CHECKPOINT_FILE
+from config import columns_order, OUTPUT_CSV, TARGETED_OUTPUT_CSV, PARTIAL_OUTPUT_CSV
 from writer import append_to_csv,ensure_columns
-from fetcher import FetchFailed
-from parsers.location_parser import extract_locations
-from parsers.property_parser import extract_properties, extract_outlet_and_proximity
-from parsers.plot_parser import extract_plots, parse_plot_data
+from sqlite_sink import DB_FILE, SqliteSink
 from constant import START_URL, NOT_AVAILABLE, RUN_DATE
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# The fetcher and parser modules (requests, bs4) are imported inside the
+# functions that use them so --check and small jobs start quickly.
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log", encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Set for targeted refreshes; an empty target set means a full-site crawl
+targets = CrawlTargets()
+# SqliteSink when --sqlite is given
+db_sink = None
+# CSV rows are appended to; a full crawl only becomes OUTPUT_CSV once it completes
+output_csv = TARGETED_OUTPUT_CSV
 
 ####Good
 def scrape_plot(
@@ -33,13 +36,22 @@ def scrape_plot(
     location_url: str,
     property_url: str
 ) -> Optional[Dict]:
+    from fetcher import FetchFailed
+    from parsers.plot_parser import parse_plot_data
     try:
         data = parse_plot_data(plot_url,region, outlet, scheme_offer, proximity)
         # data = parse_plot_data(plot_url, region, location, outlet, scheme_offer, proximity)
         if data:
-            append_to_csv(data, columns_order)
-            save_scraped_url(plot_url)
-            save_checkpoint(location_url, property_url, plot_url)
+            if not targets.matches_postcode(data.get("POSTCODE", "")):
+                logging.info(f"Skipping {plot_url}: postcode {data.get('POSTCODE')} not targeted")
+                return None
+            append_to_csv(data, columns_order, output_csv)
+            if db_sink:
+                db_sink.write(data)
+            # Targeted refreshes must not disturb the full crawl's resume state
+            if targets.is_empty():
+                save_scraped_url(plot_url)
+                save_checkpoint(location_url, property_url, plot_url, output_csv)
         return data
     except FetchFailed as e:
         logging.error(f"Fetch failed for plot URL {plot_url}: {e}")
@@ -78,6 +90,8 @@ def scrape_property(property_url: str, region: str, location_url: str,
                     scraped_urls: set, resume_plot: Optional[str]) -> None:
 # def scrape_property(property_url: str, region: str, location: str, location_url: str,
                     # scraped_urls: set, resume_plot: Optional[str]) -> None:
+    from parsers.property_parser import extract_outlet_and_proximity
+    from parsers.plot_parser import extract_plots
     human_delay()
     outlet, proximity = extract_outlet_and_proximity(property_url)
     outlet = outlet or NOT_AVAILABLE
@@ -97,7 +111,7 @@ def scrape_property(property_url: str, region: str, location_url: str,
             else:
                 continue  # skip until match
         if plot_url in scraped_urls:
-            logging.info(f"✅ Already scraped: {plot_url}")
+            logging.info(f"✅ Already scraped: {plot_url}", extra={"sample": "already_scraped"})
             continue
         human_delay()
         scrape_plot(plot_url,region,outlet, scheme_offer, proximity, location_url, property_url)
@@ -109,6 +123,7 @@ def scrape_location(location_url: str, region: str,
 # def scrape_location(location_url: str, region: str, location: str,
 #                     scraped_urls: set, resume_property_url: Optional[str],
 #                     resume_plot_url: Optional[str]) -> None:
+    from parsers.property_parser import extract_properties
     properties = list(extract_properties(location_url, region))
     # properties = list(extract_properties(location_url, region, location))
 
@@ -124,14 +139,121 @@ def scrape_location(location_url: str, region: str,
 
         scrape_property(property_url, region, location_url, scraped_urls,
                         resume_plot_url if property_url == resume_property_url else None)
+        profiling.mark(f"development {property_url}")
         # scrape_property(property_url, region, location, location_url, scraped_urls,
         #                 resume_plot_url if property_url == resume_property_url else None)
 
-def main() -> None:
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Barratt Homes new homes scraper")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run with cProfile and tracemalloc (writes barratt_profile_<run>.pstats)")
+    parser.add_argument("--sqlite", nargs="?", const=DB_FILE, metavar="DB",
+                        help=f"Also upsert rows into a SQLite database (default: {DB_FILE})")
+    parser.add_argument("--json-log", action="store_true",
+                        help="Also write a structured JSON-lines log (scraper.jsonl)")
+    parser.add_argument("--no-log-sampling", action="store_true",
+                        help="Log every high-volume info line instead of sampling them")
+    parser.add_argument("--check", "--dry-run", dest="check", action="store_true",
+                        help="List the planned work and startup time, then exit without network access")
+    add_target_arguments(parser)
+    args = parser.parse_args(argv)
+    # Barratt postcodes are only known once a plot page has been fetched, so a
+    # postcode-only run would cost as much as a full crawl
+    if args.postcode and not (args.region or args.url or args.url_file):
+        parser.error("--postcode needs --region, --url or --url-file to narrow the crawl first")
+    return args
+
+def check(args: argparse.Namespace) -> None:
+    """Print the work this invocation would do without touching the network."""
+    print(f"Barratt scraper check for run {RUN_DATE}")
+    print(f"  Targets: {targets.describe()}")
+    if targets.is_empty():
+        checkpoint = load_checkpoint()
+        print(f"  Mode: full crawl from {START_URL}")
+        if checkpoint:
+            print(f"  Resuming from {CHECKPOINT_FILE}:")
+            for key in ("location_url", "property_url", "plot_url", "output_csv"):
+                print(f"    {key}: {checkpoint.get(key) or NOT_AVAILABLE}")
+        else:
+            print("  No checkpoint; starting from the first location")
+        scraped = len(load_scraped_urls())
+        print(f"  Already scraped: {scraped} plots in {SCRAPED_LOG_FILE}")
+    else:
+        print(f"  Mode: targeted refresh of {len(targets.urls)} URLs and {len(targets.regions)} regions (checkpoint untouched)")
+        for url in targets.urls:
+            print(f"    {url}")
+    if targets.is_empty():
+        partial = (load_checkpoint() or {}).get("output_csv") or PARTIAL_OUTPUT_CSV
+        print(f"  Output: {partial}, renamed to {OUTPUT_CSV} if the crawl completes")
+    else:
+        print(f"  Output: {TARGETED_OUTPUT_CSV}")
+    if args.sqlite:
+        print(f"  SQLite: {args.sqlite}")
+    loaded = [name for name in ("bs4", "requests") if name in sys.modules]
+    print(f"  Startup: {(time.perf_counter() - STARTED_AT) * 1000:.1f} ms "
+          f"(loaded: {', '.join(loaded) or 'no parser or HTTP modules'})")
+
+def main(argv=None) -> None:
+    global targets, db_sink
+    sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args(argv)
+    if args.check:
+        targets = CrawlTargets.from_args(args)
+        check(args)
+        return
+    logsetup.setup_logging("scraper.log", "scraper.jsonl" if args.json_log else None, sample=not args.no_log_sampling)
+    targets = CrawlTargets.from_args(args)
     logging.info("Starting scrape from: %s on %s", START_URL, RUN_DATE)
+    if args.profile:
+        profiling.start_profiling(f"barratt_profile_{RUN_DATE}")
+    if args.sqlite:
+        db_sink = SqliteSink(args.sqlite)
+    try:
+        if targets.is_empty():
+            crawl()
+        else:
+            crawl_targets()
+    finally:
+        if db_sink:
+            db_sink.close()
+        profiling.stop_profiling()
+
+def region_from_url(url: str) -> str:
+    parts = [p for p in urlparse(url).path.split('/') if p]
+    return parts[1].replace('-', ' ').title() if len(parts) > 1 else NOT_AVAILABLE
+
+def crawl_targets() -> None:
+    """Refresh only the targeted regions and URLs, re-reading every plot and leaving the checkpoint alone."""
+    from parsers.location_parser import extract_locations
+    logging.info("Targeted refresh: %s", targets.describe())
+    try:
+        for url in targets.urls:
+            region = region_from_url(url)
+            # /new-homes/<region>/ is a location page; anything deeper is a development
+            if len([p for p in urlparse(url).path.split('/') if p]) <= 2:
+                scrape_location(url, region, set(), None, None)
+            else:
+                scrape_property(url, region, url, set(), None)
+
+        if targets.regions or not targets.urls:
+            for location_url, region in extract_locations(START_URL):
+                if targets.matches_region(region):
+                    scrape_location(location_url, region, set(), None, None)
+
+        logging.info("Targeted refresh completed successfully.")
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user. Partial data saved.")
+    except Exception as e:
+        logging.error("Critical error in targeted refresh: %s", str(e), exc_info=True)
+
+def crawl() -> None:
+    global output_csv
+    from parsers.location_parser import extract_locations
 
     scraped_urls = load_scraped_urls()
     checkpoint = load_checkpoint()
+    # A resumed crawl keeps appending to the file the interrupted run started
+    output_csv = (checkpoint or {}).get("output_csv") or PARTIAL_OUTPUT_CSV
 
     resume_location_url = checkpoint.get("location_url") if checkpoint else None
     resume_property_url = checkpoint.get("property_url") if checkpoint else None
@@ -158,6 +280,9 @@ def main() -> None:
         # ✅ Finished successfully
         logging.info("Scraping completed successfully. Clearing checkpoint.")
         clear_checkpoint()
+        if os.path.exists(output_csv):
+            os.replace(output_csv, OUTPUT_CSV)
+            logging.info("Full snapshot saved as %s", OUTPUT_CSV)
 
     except KeyboardInterrupt:
         logging.warning("Interrupted by user. Partial data saved.")
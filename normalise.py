@@ -0,0 +1,142 @@
+import argparse
+import glob
+import logging
+import os
+import re
+import time
+from datetime import datetime
+import pandas as pd
+
+# --- Post-crawl typed normalisation ---
+# Loads scraper CSVs from any builder and converts whole columns at once into
+# numeric / categorical / datetime dtypes with real nulls, then computes price
+# aggregates per region and per development.
+
+NA_VALUES = ["NOT_AVAILABLE"]
+
+# Full-run snapshots only: mpi_<builder>_<run date>.csv. Both scrapers write
+# under a *_partial_* name until a full crawl completes, and targeted, replay and
+# this stage's own outputs have extra name parts, so none of those match.
+SNAPSHOT_PATTERN = re.compile(r'^mpi_([a-z]+)_(\d{2}_\d{2}_\d{4}_\d{2}_\d{2}_\d{2})\.csv$')
+RUN_DATE_FORMAT = "%m_%d_%Y_%H_%M_%S"
+
+CATEGORY_COLUMNS = [
+    "COMPANY_NAME", "BRAND_NAME", "SOURCE_SITE", "REGION", "OUTLET", "COUNTY", "CITY",
+    "LOCATION", "TYPE", "PROPERTY_TYPE", "AVAILABILITY", "TENURE",
+]
+COUNT_COLUMNS = {"BEDROOM": "BEDROOMS", "BATHROOM": "BATHROOMS", "LIVING_ROOM": "LIVING_ROOMS"}
+REGION_KEYS = ["COMPANY_NAME", "REGION"]
+DEVELOPMENT_KEYS = ["COMPANY_NAME", "REGION", "OUTLET"]
+
+
+def latest_snapshots(directory: str = ".") -> list:
+    """Newest full snapshot per builder in `directory`."""
+    latest = {}
+    for path in glob.glob(os.path.join(directory, "mpi_*.csv")):
+        m = SNAPSHOT_PATTERN.match(os.path.basename(path))
+        if not m:
+            continue
+        run = datetime.strptime(m.group(2), RUN_DATE_FORMAT)
+        if m.group(1) not in latest or run > latest[m.group(1)][0]:
+            latest[m.group(1)] = (run, path)
+    return sorted(path for _, path in latest.values())
+
+
+def load_outputs(paths) -> pd.DataFrame:
+    """Read scraper CSVs as strings, with NOT_AVAILABLE turned into nulls by the CSV parser."""
+    frames = [pd.read_csv(p, dtype=str, keep_default_na=False, na_values=NA_VALUES) for p in paths]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _money(series: pd.Series) -> pd.Series:
+    # "£289,995" -> 289995.0; "Awaiting release" and other text -> NaN
+    return pd.to_numeric(series.str.replace(r"[£,\s]", "", regex=True), errors="coerce")
+
+
+def normalise(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a typed copy of `df`.
+
+    PRICE, PRICE_RANGE_MIN/MAX, BEDROOMS/BATHROOMS/LIVING_ROOMS and HAS_PLOT are
+    added next to their source strings; LATITUDE, LONGITUDE, RUN_DATE and the
+    CATEGORY_COLUMNS are converted in place.
+    """
+    out = df.copy()
+
+    out["PRICE"] = _money(out["PRICE_LATEST"])
+    range_values = out["PRICE_RANGE"].str.extractall(r"£\s*([\d,]+)")[0].str.replace(",", "", regex=False)
+    range_values = pd.to_numeric(range_values, errors="coerce").groupby(level=0)
+    out["PRICE_RANGE_MIN"] = range_values.min().reindex(out.index)
+    out["PRICE_RANGE_MAX"] = range_values.max().reindex(out.index)
+
+    for source, target in COUNT_COLUMNS.items():
+        counts = pd.to_numeric(out[source].str.extract(r"(\d+)", expand=False), errors="coerce")
+        out[target] = counts.astype("Int16")
+
+    out["LATITUDE"] = pd.to_numeric(out["LATITUDE"], errors="coerce")
+    out["LONGITUDE"] = pd.to_numeric(out["LONGITUDE"], errors="coerce")
+    out["RUN_DATE"] = pd.to_datetime(out["RUN_DATE"], format=RUN_DATE_FORMAT, errors="coerce")
+    out["HAS_PLOT"] = out["PLOT"].ne("NO_PLOTS") & out["PLOT"].notna()
+
+    for col in CATEGORY_COLUMNS:
+        if col in out:
+            out[col] = out[col].astype("category")
+    return out
+
+
+def price_aggregates(df: pd.DataFrame, keys) -> pd.DataFrame:
+    """Count/min/median/mean/max of PRICE for every group in `keys`, ignoring unpriced plots."""
+    priced = df.loc[df["PRICE"].notna(), list(keys) + ["PRICE"]]
+    return priced.groupby(list(keys), observed=True)["PRICE"].agg(
+        plots="count", min="min", median="median", mean="mean", max="max"
+    ).reset_index()
+
+
+def _has_parquet_engine() -> bool:
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def _write(df: pd.DataFrame, path: str):
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    elif path.endswith(".pkl"):
+        df.to_pickle(path)
+    else:
+        df.to_csv(path, index=False)
+    logging.info(f"Wrote {len(df)} rows to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalise scraper CSV output into typed columns and price aggregates")
+    parser.add_argument("inputs", nargs="*", help="Scraper CSVs (default: the newest full snapshot per builder in the current directory)")
+    parser.add_argument("--out", default="mpi_normalised.pkl",
+                        help="Output file; .pkl, .csv or .parquet (needs pyarrow or fastparquet) (default: mpi_normalised.pkl)")
+    args = parser.parse_args(argv)
+    if args.out.endswith(".parquet") and not _has_parquet_engine():
+        parser.error("Writing .parquet needs pyarrow or fastparquet; install one or use a .pkl/.csv --out")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    paths = args.inputs or latest_snapshots()
+    if not paths:
+        logging.error("No full snapshot CSVs found")
+        return
+
+    start = time.perf_counter()
+    df = normalise(load_outputs(paths))
+    by_region = price_aggregates(df, REGION_KEYS)
+    by_development = price_aggregates(df, DEVELOPMENT_KEYS)
+    logging.info(f"Normalised {len(df)} rows from {len(paths)} files in {time.perf_counter() - start:.3f}s")
+
+    stem, _ = os.path.splitext(args.out)
+    _write(df, args.out)
+    _write(by_region, f"{stem}_region_prices.csv")
+    _write(by_development, f"{stem}_development_prices.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import logging
+
+# --- Opt-in run profiling (cProfile + tracemalloc) ---
+# All functions are no-ops until start_profiling() is called, so call sites
+# can mark stage boundaries unconditionally. cProfile, pstats and tracemalloc
+# are only imported once profiling is switched on.
+
+TOP_ALLOCATORS = 10
+
+_profiler = None
+_prefix = None
+_first_snapshot = None
+_last_snapshot = None
+_last_label = None
+
+
+def start_profiling(prefix: str):
+    """Start cProfile and tracemalloc; output files are named after `prefix`."""
+    global _profiler, _prefix, _first_snapshot, _last_snapshot, _last_label
+    if _profiler is not None:
+        return
+    import cProfile
+    import tracemalloc
+    _prefix = prefix
+    tracemalloc.start()  # One frame: every report groups by the allocating line
+    _first_snapshot = _last_snapshot = tracemalloc.take_snapshot()
+    _last_label = "start"
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    logging.info(f"Profiling enabled, writing {_prefix}.pstats")
+
+
+def mark(label: str):
+    """Take a tracemalloc snapshot at a stage boundary and log growth since the previous one."""
+    global _last_snapshot, _last_label
+    if _profiler is None:
+        return
+    import tracemalloc
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    growth = sum(s.size_diff for s in snapshot.compare_to(_last_snapshot, 'filename'))
+    logging.info(
+        f"[profile] {label}: current={current / 1024:.0f} KiB peak={peak / 1024:.0f} KiB "
+        f"growth since '{_last_label}'={growth / 1024:+.0f} KiB"
+    )
+    _last_snapshot = snapshot
+    _last_label = label
+
+
+def _report_allocators(snapshot):
+    logging.info(f"[profile] Top {TOP_ALLOCATORS} allocators at end of run:")
+    for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]:
+        logging.info(f"[profile]   {stat}")
+    logging.info(f"[profile] Top {TOP_ALLOCATORS} memory growth over the run:")
+    for stat in snapshot.compare_to(_first_snapshot, 'lineno')[:TOP_ALLOCATORS]:
+        logging.info(f"[profile]   {stat}")
+
+
+def stop_profiling():
+    """Stop profiling, dump pstats files and log the memory report."""
+    global _profiler, _first_snapshot, _last_snapshot
+    if _profiler is None:
+        return
+    import pstats
+    import tracemalloc
+    _profiler.disable()
+    try:
+        mark("end")
+        _report_allocators(_last_snapshot)
+
+        pstats_file = f"{_prefix}.pstats"
+        _profiler.dump_stats(pstats_file)
+        with open(f"{_prefix}_pstats.txt", 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(_profiler, stream=f)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+        logging.info(f"[profile] CPU profile saved to {pstats_file}")
+    except Exception as e:
+        logging.error(f"Failed to write profiling report: {e}", exc_info=True)
+    finally:
+        tracemalloc.stop()
+        _profiler = None
+        _first_snapshot = _last_snapshot = None
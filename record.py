@@ -0,0 +1,68 @@
+import sys
+from constant import NOT_AVAILABLE, OUTPUT_COLUMNS
+
+# --- Compact plot row ---
+# Rows share the column layout in constant.OUTPUT_COLUMNS, so a record only
+# needs a flat list of values instead of a 39-key dict. Short strings (sentinels, statuses,
+# region and development names) are interned so repeated values across plots
+# point at one shared object.
+
+RECORD_COLUMNS = OUTPUT_COLUMNS
+FIELD_INDEX = {name: i for i, name in enumerate(RECORD_COLUMNS)}
+INTERN_MAX_LEN = 64
+
+
+def matches_layout(columns) -> bool:
+    return tuple(columns) == RECORD_COLUMNS
+
+
+def intern_value(value):
+    if type(value) is str and len(value) <= INTERN_MAX_LEN:
+        return sys.intern(value)
+    return value
+
+
+class PlotRecord:
+    """A single output row stored as a list of values ordered like RECORD_COLUMNS."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values):
+        self._values = values
+
+    @classmethod
+    def from_dict(cls, base: dict) -> "PlotRecord":
+        return cls([intern_value(base.get(col, NOT_AVAILABLE)) for col in RECORD_COLUMNS])
+
+    def derive(self, updates: dict) -> "PlotRecord":
+        """Return a new record with this record's values overridden by `updates`."""
+        values = list(self._values)
+        for key, value in updates.items():
+            values[FIELD_INDEX[key]] = intern_value(value)
+        return PlotRecord(values)
+
+    def __getitem__(self, key):
+        return self._values[FIELD_INDEX[key]]
+
+    def __setitem__(self, key, value):
+        self._values[FIELD_INDEX[key]] = intern_value(value)
+
+    def __contains__(self, key):
+        return key in FIELD_INDEX
+
+    def __repr__(self):
+        return f"PlotRecord({self.to_dict()!r})"
+
+    def get(self, key, default=None):
+        idx = FIELD_INDEX.get(key)
+        return default if idx is None else self._values[idx]
+
+    def keys(self):
+        return list(RECORD_COLUMNS)
+
+    def to_row(self) -> list:
+        """Values in RECORD_COLUMNS order, ready for csv.writer."""
+        return list(self._values)
+
+    def to_dict(self) -> dict:
+        return dict(zip(RECORD_COLUMNS, self._values))
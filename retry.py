@@ -0,0 +1,179 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# --- Shared retry engine for both scrapers ---
+# Capped exponential backoff with full jitter, retryable vs fatal status
+# classification, a total deadline per request, and a per-host circuit breaker
+# that pauses every caller while the host is failing.
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryError(Exception):
+    """Raised when a request gets a fatal status or runs out of attempts or time."""
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class RetryPolicy:
+    def __init__(self, attempts=4, base_delay=1.0, max_delay=30.0, deadline=120.0, timeout=30):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.timeout = timeout
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; while open, every request to the host waits."""
+
+    def __init__(self, host, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._next_cooldown = cooldown
+
+    def wait(self) -> float:
+        """Block until the breaker is closed; returns the seconds spent waiting."""
+        with self._lock:
+            remaining = self._open_until - time.monotonic()
+        if remaining <= 0:
+            return 0.0
+        logging.warning(f"Circuit open for {self.host}, pausing requests for {remaining:.0f}s")
+        time.sleep(remaining)
+        return remaining
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._next_cooldown = self.cooldown
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.threshold:
+                return
+            self._failures = 0
+            self._open_until = time.monotonic() + self._next_cooldown
+            logging.warning(f"Too many failures on {self.host}, opening circuit for {self._next_cooldown:.0f}s")
+            self._next_cooldown = min(self._next_cooldown * 2, self.max_cooldown)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    host = urlparse(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def request_with_retry(url: str, policy: RetryPolicy = DEFAULT_POLICY, session=None, method="GET", **kwargs):
+    """Perform an HTTP request under `policy`, returning the response or raising RetryError.
+
+    Time spent waiting on an open circuit breaker does not count against the deadline.
+    """
+    import requests  # Deferred so importing this module stays cheap
+    breaker = get_breaker(url)
+    deadline = time.monotonic() + policy.deadline
+    timeout = kwargs.pop("timeout", policy.timeout)
+    response = None
+    last_error = None
+    attempt = 0
+
+    for attempt in range(1, policy.attempts + 1):
+        deadline += breaker.wait()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        response = None
+        try:
+            response = (session or requests).request(method, url, timeout=min(timeout, remaining), **kwargs)
+        except requests.exceptions.RequestException as e:
+            last_error = e
+            breaker.record_failure()
+        else:
+            if response.status_code < 400:
+                breaker.record_success()
+                return response
+            if response.status_code not in RETRYABLE_STATUSES:
+                raise RetryError(f"Status {response.status_code} for {url}", response)
+            last_error = f"status {response.status_code}"
+            breaker.record_failure()
+
+        if attempt == policy.attempts:
+            break
+        delay = policy.backoff(attempt - 1)
+        if response is not None:
+            delay = max(delay, min(_retry_after(response), policy.max_delay))
+        delay = min(delay, deadline - time.monotonic())
+        if delay <= 0:
+            break
+        logging.warning(f"Error fetching {url}: {last_error}. Retrying {attempt}/{policy.attempts} in {delay:.1f}s...")
+        if response is not None:
+            response.close()  # Return the pooled connection before waiting
+        time.sleep(delay)
+
+    raise RetryError(f"Failed to fetch {url} after {attempt} attempts: {last_error}", response)
+
+
+def call_with_retry(url: str, fn, policy: RetryPolicy = DEFAULT_POLICY):
+    """Call `fn()` for non-HTTP work on `url` (e.g. a browser render) under `policy` and the host's breaker.
+
+    A RetryError raised by `fn` is fatal and propagates at once without touching the breaker; any other
+    exception counts as a failed attempt. RetryError is raised once attempts or time run out.
+    """
+    breaker = get_breaker(url)
+    deadline = time.monotonic() + policy.deadline
+    last_error = None
+    attempt = 0
+
+    for attempt in range(1, policy.attempts + 1):
+        deadline += breaker.wait()
+        if deadline - time.monotonic() <= 0:
+            break
+        try:
+            result = fn()
+        except RetryError:
+            raise
+        except Exception as e:
+            last_error = e
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            return result
+
+        if attempt == policy.attempts:
+            break
+        delay = min(policy.backoff(attempt - 1), deadline - time.monotonic())
+        if delay <= 0:
+            break
+        logging.warning(f"Error loading {url}: {last_error}. Retrying {attempt}/{policy.attempts} in {delay:.1f}s...")
+        time.sleep(delay)
+
+    raise RetryError(f"Failed to load {url} after {attempt} attempts: {last_error}")
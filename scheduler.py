@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+
+# --- Staleness-aware scheduling ---
+# Remembers, per development and house type URL, when it was last scraped
+# successfully, how often its plots changed between checks and how many plots
+# were for sale. Work is ranked by staleness x change rate x for-sale plots so a
+# time-boxed run refreshes the most valuable pages first; pages never scraped
+# rank ahead of everything else. A development is only as fresh as its stalest
+# house type, so one cut short by the budget stays near the front of the queue.
+
+STATE_FILE = "crawl_state.json"
+SAVE_EVERY = 25  # Records between state file writes, so an aborted run keeps most of its history
+
+
+def fingerprint(values) -> str:
+    """Stable digest of an iterable of tuples, e.g. (plot, price, availability) per plot."""
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update("|".join(str(v) for v in value).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class CrawlState:
+    """Per-URL scrape history, loaded from and saved to a JSON file."""
+
+    def __init__(self, path: str = STATE_FILE):
+        self.path = path
+        self.items = {}
+        self._unsaved = 0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.items = json.load(f).get("items", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable crawl state {path}: {e}")
+
+    def record(self, url: str, digest: str, for_sale: int = None, parent: str = None, children=None):
+        """Record a successful scrape of `url`; a changed digest counts as a change."""
+        entry = self.items.setdefault(url, {"checks": 0, "changes": 0})
+        if entry.get("fingerprint") is not None and entry["fingerprint"] != digest:
+            entry["changes"] += 1
+        entry["checks"] += 1
+        entry["fingerprint"] = digest
+        entry["last_success"] = round(time.time(), 1)
+        if for_sale is not None:
+            entry["for_sale"] = for_sale
+        if parent:
+            entry["parent"] = parent
+        if children is not None:
+            entry["children"] = list(children)
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def _child_for_sale(self) -> dict:
+        totals = {}
+        for entry in self.items.values():
+            if entry.get("parent"):
+                totals[entry["parent"]] = totals.get(entry["parent"], 0) + entry.get("for_sale", 0)
+        return totals
+
+    def last_success(self, url: str):
+        """Oldest successful scrape of `url` and its child pages; None if any of them was never scraped."""
+        entry = self.items.get(url)
+        if not entry or "last_success" not in entry:
+            return None
+        times = [entry["last_success"]]
+        for child in entry.get("children", ()):
+            child_time = self.items.get(child, {}).get("last_success")
+            if child_time is None:
+                return None
+            times.append(child_time)
+        return min(times)
+
+    def score(self, url: str, now: float = None, child_for_sale: dict = None) -> float:
+        entry = self.items.get(url)
+        last_success = self.last_success(url)
+        if last_success is None:
+            return math.inf
+        now = time.time() if now is None else now
+        age_hours = max(now - last_success, 0) / 3600
+        # Smoothed so pages that have never changed still age into the queue
+        change_rate = (entry["changes"] + 1) / (entry["checks"] + 2)
+        for_sale = entry.get("for_sale")
+        if for_sale is None:
+            for_sale = (child_for_sale or {}).get(url, 0)
+        return age_hours * change_rate * (1 + for_sale)
+
+    def rank(self, items, key=lambda item: item) -> list:
+        """Return `items` highest score first; ties keep their original (site) order."""
+        now = time.time()
+        totals = self._child_for_sale()
+        scores = {}
+        for item in items:
+            scores[id(item)] = self.score(key(item), now, totals)
+        return sorted(items, key=lambda item: -scores[id(item)])
+
+    def describe(self, url: str) -> str:
+        entry = self.items.get(url)
+        last_success = self.last_success(url)
+        if last_success is None:
+            return "never scraped" if not entry or "last_success" not in entry else "has unscraped house types"
+        age_hours = (time.time() - last_success) / 3600
+        for_sale = entry.get("for_sale")
+        if for_sale is None:
+            for_sale = self._child_for_sale().get(url, 0)
+        return (f"last scraped {age_hours:.1f}h ago, changed {entry['changes']}/{entry['checks']} checks, "
+                f"{for_sale} for sale")
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"items": self.items}, f, indent=1)
+        os.replace(tmp, self.path)
+        self._unsaved = 0
+
+
+class Budget:
+    """Wall-clock budget for a run; None means unlimited."""
+
+    def __init__(self, minutes: float = None):
+        self.seconds = minutes * 60 if minutes else None
+        self.start = time.monotonic()
+        self.stopped_early = False  # Set by the caller when work was skipped for lack of time
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def exhausted(self) -> bool:
+        return self.seconds is not None and self.elapsed() >= self.seconds
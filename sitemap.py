@@ -0,0 +1,97 @@
+import gzip
+import logging
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+from retry import RetryPolicy, RetryError, request_with_retry
+
+# --- sitemap.xml discovery ---
+# Sitemaps are parsed with iterparse straight off the response stream and each
+# <url>/<sitemap> element is released once read, so large sitemap files never
+# have to be held in memory as a whole.
+
+MAX_INDEX_DEPTH = 3
+SITEMAP_POLICY = RetryPolicy(attempts=3)
+
+
+def find_sitemaps(base_url: str, headers: dict, timeout: int = 30) -> list:
+    """Return sitemap URLs advertised in robots.txt, falling back to /sitemap.xml."""
+    sitemaps = []
+    try:
+        resp = request_with_retry(f"{base_url}/robots.txt", SITEMAP_POLICY, headers=headers, timeout=timeout, verify=False)
+        for line in resp.text.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(value.strip())
+    except RetryError as e:
+        logging.warning(f"Could not read robots.txt for {base_url}: {e}")
+    return sitemaps or [f"{base_url}/sitemap.xml"]
+
+
+def iter_sitemap(sitemap_url: str, headers: dict, timeout: int = 30, _depth: int = 0):
+    """Yield (loc, lastmod) for every page in a sitemap, following sitemap index files."""
+    try:
+        resp = request_with_retry(sitemap_url, SITEMAP_POLICY, headers=headers, timeout=timeout, verify=False, stream=True)
+    except RetryError as e:
+        logging.warning(f"Could not fetch sitemap {sitemap_url}: {e}")
+        return
+
+    resp.raw.decode_content = True
+    stream = resp.raw
+    if urlparse(sitemap_url).path.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=stream)
+
+    children = []
+    root = None
+    try:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event != "end":
+                continue
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in elem:
+                name = child.tag.rsplit('}', 1)[-1]
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip() or None
+            if loc:
+                if tag == "sitemap":
+                    children.append(loc)
+                else:
+                    yield loc, lastmod
+            root.clear()
+    except ET.ParseError as e:
+        logging.warning(f"Could not parse sitemap {sitemap_url}: {e}")
+    finally:
+        resp.close()
+
+    if _depth >= MAX_INDEX_DEPTH:
+        if children:
+            logging.warning(f"Sitemap index nesting too deep at {sitemap_url}, skipping {len(children)} children")
+        return
+    for child_url in children:
+        yield from iter_sitemap(child_url, headers, timeout, _depth + 1)
+
+
+def classify_entries(entries, patterns: dict) -> dict:
+    """Group (loc, lastmod) entries by the first path pattern they match.
+
+    `patterns` maps a kind name to a compiled regex applied to the URL path.
+    Returns {kind: [(loc, lastmod, match), ...]} sorted newest lastmod first;
+    entries without a lastmod sort first since they may have changed.
+    """
+    grouped = {kind: [] for kind in patterns}
+    for loc, lastmod in entries:
+        path = urlparse(loc).path
+        for kind, pattern in patterns.items():
+            m = pattern.match(path)
+            if m:
+                grouped[kind].append((loc, lastmod, m))
+                break
+    for items in grouped.values():
+        items.sort(key=lambda item: (item[1] is None, item[1] or ""), reverse=True)
+    return grouped
@@ -0,0 +1,117 @@
+import logging
+import sqlite3
+from datetime import datetime
+from constant import NOT_AVAILABLE, OUTPUT_COLUMNS
+from record import PlotRecord
+
+# --- SQLite sink ---
+# Rows are buffered and written with executemany upserts, one transaction per
+# batch. `plots` holds the latest state per (COMPANY_NAME, OUTLET, PLOT, TYPE)
+# with first/last seen timestamps; `price_history` gets a row whenever a plot's
+# price or availability differs from what was stored before.
+
+DB_FILE = "mpi_homes.sqlite"
+KEY_COLUMNS = ("COMPANY_NAME", "OUTLET", "PLOT", "TYPE")
+DATA_COLUMNS = [col for col in OUTPUT_COLUMNS if col not in KEY_COLUMNS]
+
+
+def _schema() -> str:
+    cols = ",\n    ".join(f'"{col}" TEXT NOT NULL' for col in OUTPUT_COLUMNS)
+    key = ", ".join(f'"{col}"' for col in KEY_COLUMNS)
+    return f"""
+CREATE TABLE IF NOT EXISTS plots (
+    {cols},
+    FIRST_SEEN TEXT NOT NULL,
+    LAST_SEEN TEXT NOT NULL,
+    PRIMARY KEY ({key})
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    COMPANY_NAME TEXT NOT NULL,
+    OUTLET TEXT NOT NULL,
+    PLOT TEXT NOT NULL,
+    TYPE TEXT NOT NULL,
+    PRICE_LATEST TEXT NOT NULL,
+    AVAILABILITY TEXT NOT NULL,
+    SEEN_AT TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_key ON price_history ({key}, SEEN_AT);
+"""
+
+
+def _upsert_sql() -> str:
+    all_cols = list(OUTPUT_COLUMNS) + ["FIRST_SEEN", "LAST_SEEN"]
+    names = ", ".join(f'"{col}"' for col in all_cols)
+    params = ", ".join("?" for _ in all_cols)
+    key = ", ".join(f'"{col}"' for col in KEY_COLUMNS)
+    updates = ",\n    ".join(f'"{col}" = excluded."{col}"' for col in DATA_COLUMNS + ["LAST_SEEN"])
+    return f"INSERT INTO plots ({names}) VALUES ({params})\nON CONFLICT ({key}) DO UPDATE SET\n    {updates}"
+
+
+# Record a history row only for new plots or when price/availability changed
+HISTORY_SQL = """
+INSERT INTO price_history (COMPANY_NAME, OUTLET, PLOT, TYPE, PRICE_LATEST, AVAILABILITY, SEEN_AT)
+SELECT ?, ?, ?, ?, ?, ?, ?
+WHERE NOT EXISTS (
+    SELECT 1 FROM plots
+    WHERE COMPANY_NAME = ? AND OUTLET = ? AND PLOT = ? AND TYPE = ?
+      AND PRICE_LATEST = ? AND AVAILABILITY = ?
+)
+"""
+
+
+class SqliteSink:
+    """Batched upsert sink with the same write/close interface as writer.CsvSink."""
+
+    def __init__(self, path: str = DB_FILE, batch_size: int = 500, seen_at: str = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.seen_at = seen_at or datetime.now().isoformat(timespec='seconds')
+        self.count = 0
+        self._batch = []
+        self._upsert = _upsert_sql()
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_schema())
+        logging.info(f"Upserting records into {path}")
+
+    def write(self, row):
+        if isinstance(row, PlotRecord):
+            values = row.to_row()
+        else:
+            values = [row.get(col, NOT_AVAILABLE) for col in OUTPUT_COLUMNS]
+        self._batch.append([NOT_AVAILABLE if v is None else str(v) for v in values])
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        idx = {col: i for i, col in enumerate(OUTPUT_COLUMNS)}
+        # The history check only sees the state before this batch, so keep one row (the last) per key
+        latest = {}
+        for values in self._batch:
+            latest[tuple(values[idx[col]] for col in KEY_COLUMNS)] = values
+        rows = list(latest.values())
+        history = []
+        for key, values in latest.items():
+            state = [values[idx["PRICE_LATEST"]], values[idx["AVAILABILITY"]]]
+            history.append(list(key) + state + [self.seen_at] + list(key) + state)
+        try:
+            with self._conn:
+                # History first: the NOT EXISTS check must compare against the previous state
+                self._conn.executemany(HISTORY_SQL, history)
+                self._conn.executemany(self._upsert, [values + [self.seen_at, self.seen_at] for values in rows])
+            self.count += len(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Failed to upsert {len(self._batch)} records into {self.path}: {e}", exc_info=True)
+        finally:
+            self._batch = []
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+        logging.info(f"Successfully upserted {self.count} records into {self.path}")
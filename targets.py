@@ -0,0 +1,83 @@
+import re
+
+# --- Targeted partial refresh ---
+# Restricts a crawl to named regions, explicit URLs and/or postcode prefixes so
+# intraday refreshes only touch the requested subtrees.
+
+
+def name_key(name: str) -> str:
+    """Normalise a region name or URL slug so "North East" and "north-east" compare equal."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+# A whole outward code (district), e.g. "NE1", "SW1A", "B33"
+OUTWARD_CODE = re.compile(r'^[A-Z]{1,2}\d[A-Z\d]?$')
+
+
+def normalise_postcode(postcode: str) -> str:
+    """Upper-case with one space before the inward code: "ne14ab" -> "NE1 4AB"."""
+    clean = re.sub(r'\s+', '', (postcode or '').upper())
+    return f"{clean[:-3]} {clean[-3:]}" if len(clean) >= 5 else clean
+
+
+def read_url_file(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+class CrawlTargets:
+    """The subset of the site a targeted run should cover; an empty target set means the full site."""
+
+    def __init__(self, regions=(), urls=(), postcodes=()):
+        self.regions = {name_key(r) for r in regions if r.strip()}
+        self.urls = [u.strip() for u in urls if u.strip()]
+        self.postcodes = tuple(" ".join(p.upper().split()) for p in postcodes if p.strip())
+
+    @classmethod
+    def from_args(cls, args) -> "CrawlTargets":
+        urls = list(args.url or [])
+        if args.url_file:
+            urls.extend(read_url_file(args.url_file))
+        return cls(args.region or [], urls, args.postcode or [])
+
+    def is_empty(self) -> bool:
+        return not (self.regions or self.urls or self.postcodes)
+
+    def matches_region(self, name: str) -> bool:
+        return not self.regions or name_key(name) in self.regions
+
+    def matches_postcode(self, postcode: str) -> bool:
+        """A full outward code ("NE1") matches that district only; other prefixes ("NE", "NE1 4") match by text."""
+        if not self.postcodes:
+            return True
+        clean = normalise_postcode(postcode)
+        outward = clean.split(" ")[0]
+        for prefix in self.postcodes:
+            if OUTWARD_CODE.match(prefix):
+                if outward == prefix:
+                    return True
+            elif clean.startswith(prefix):
+                return True
+        return False
+
+    def describe(self) -> str:
+        parts = []
+        if self.regions:
+            parts.append(f"regions={sorted(self.regions)}")
+        if self.urls:
+            parts.append(f"{len(self.urls)} URLs")
+        if self.postcodes:
+            parts.append(f"postcodes={list(self.postcodes)}")
+        return ", ".join(parts) or "full site"
+
+
+def add_target_arguments(parser):
+    group = parser.add_argument_group("targeted refresh")
+    group.add_argument("--region", action="append", metavar="NAME",
+                       help="Only crawl this region (repeatable)")
+    group.add_argument("--url", action="append", metavar="URL",
+                       help="Only crawl this region, development or house type URL (repeatable)")
+    group.add_argument("--url-file", metavar="PATH",
+                       help="File with one URL per line to crawl ('#' comments allowed)")
+    group.add_argument("--postcode", action="append", metavar="PREFIX",
+                       help="Only emit developments whose postcode starts with PREFIX (repeatable)")
@@ -49,11 +49,12 @@ def save_scraped_url(url: str):
     with open(SCRAPED_LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(url.strip() + '\n')
 
-def save_checkpoint(location_url: str, property_url: str, plot_url: str):
+def save_checkpoint(location_url: str, property_url: str, plot_url: str, output_csv: str = None):
     checkpoint = {
         "location_url": location_url,
         "property_url": property_url,
-        "plot_url": plot_url
+        "plot_url": plot_url,
+        "output_csv": output_csv
     }
     with open(CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
         json.dump(checkpoint, f, indent=2)
@@ -3,6 +3,7 @@ import logging
 import os
 from config import OUTPUT_CSV
 from constant import NOT_AVAILABLE
+from record import PlotRecord, matches_layout
 import html
 import re
 
@@ -24,6 +25,8 @@ def save_to_csv(rows, columns_order):
         logging.error(f"Failed to write CSV: {e}", exc_info=True)
 
 def append_to_csv(row, columns_order, filename=OUTPUT_CSV):
+    if isinstance(row, PlotRecord):
+        row = row.to_dict()
     try:
         file_exists = False
         try:
@@ -42,4 +45,63 @@ def append_to_csv(row, columns_order, filename=OUTPUT_CSV):
                     row[col] = NOT_AVAILABLE
             writer.writerow(row)
     except Exception as e:
-        logging.error(f"Failed to append to CSV: {e}", exc_info=True)
\ No newline at end of file
+        logging.error(f"Failed to append to CSV: {e}", exc_info=True)
+
+class CsvSink:
+    """Streams rows (dicts or PlotRecords) to a CSV file as they are produced so nothing is kept in memory."""
+
+    def __init__(self, filename, columns_order, flush_every=100):
+        self.filename = filename
+        self.columns_order = columns_order
+        # Records can be written as-is only when this file uses the record slot layout
+        self._record_layout = matches_layout(columns_order)
+        self.flush_every = flush_every
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, row):
+        if self._file is None:
+            self._file = open(self.filename, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns_order)
+        if isinstance(row, PlotRecord) and self._record_layout:
+            self._writer.writerow(row.to_row())
+        else:
+            self._writer.writerow([row.get(col, NOT_AVAILABLE) for col in self.columns_order])
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            if not self.count:
+                logging.warning("No data to save.")
+            return
+        try:
+            self._file.close()
+            logging.info(f"Successfully saved {self.count} records to {self.filename}")
+        except Exception as e:
+            logging.error(f"Error closing CSV {self.filename}: {e}")
+        finally:
+            self._file = None
+            self._writer = None
+
+
+class TeeSink:
+    """Writes every row to several sinks (e.g. CSV and SQLite) at once."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    @property
+    def count(self):
+        return self.sinks[0].count if self.sinks else 0
+
+    def write(self, row):
+        for s in self.sinks:
+            s.write(row)
+
+    def close(self):
+        for s in self.sinks:
+            s.close()